@@ -0,0 +1,189 @@
+"""
+Kiosk swipe load benchmark: WSGI vs ASGI serving profiles.
+
+Simulates N kiosks (default 200) that each keep one swipe in flight against
+a check-in/check-out endpoint, and reports requests/sec and latency
+percentiles per target. Only the standard library is used, so it can run
+from any box that can reach the servers.
+
+Start the two profiles against the same database, e.g.:
+
+    SERVER_PROFILE=wsgi gunicorn -c gunicorn.conf.py --bind 0.0.0.0:8000
+    SERVER_PROFILE=asgi gunicorn -c gunicorn.conf.py --bind 0.0.0.0:8001
+
+then compare them:
+
+    python benchmarks/kiosk_load.py \\
+        --target wsgi=http://localhost:8000/attendance/checkin/ \\
+        --target asgi=http://localhost:8001/attendance/async/checkin/ \\
+        --documents 1000000-1000999 --kiosks 200 --duration 30
+
+Document ids must belong to existing employees. Repeated check-ins answer
+409 after the first one of the day, which still exercises the INSERT path.
+Only 2xx and 409 answers count as served. Any other 4xx (e.g. a 401 because
+the server requires signed swipes) makes the run fail instead of being
+measured as throughput.
+
+With --device-id/--device-secret (a registered KioskDevice) every request
+is HMAC-signed as attendance.authentication expects, so the numbers include
+signature and nonce checks.
+"""
+import argparse
+import hashlib
+import hmac
+import http.client
+import json
+import secrets
+import sys
+import statistics
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+# Answers that are a normal outcome of a swipe
+SERVED = (200, 409)
+
+
+def _headers(device, path, body):
+    headers = {'Content-Type': 'application/json'}
+    if device is None:
+        return headers
+    device_id, secret = device
+    timestamp = str(int(time.time()))
+    nonce = secrets.token_hex(16)
+    message = f'{timestamp}\n{nonce}\nPOST\n{path}\n'.encode() + body
+    headers.update({
+        'X-Kiosk-Device': device_id,
+        'X-Kiosk-Timestamp': timestamp,
+        'X-Kiosk-Nonce': nonce,
+        'X-Kiosk-Signature': hmac.new(secret.encode(), message, hashlib.sha256).hexdigest(),
+    })
+    return headers
+
+
+def _kiosk(url, documents, offset, stop_at, latencies, statuses, lock, device):
+    parts = urlsplit(url)
+    path = f'{parts.path}?{parts.query}' if parts.query else parts.path
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=30)
+    index = offset
+    local_latencies = []
+    local_statuses = Counter()
+
+    while time.monotonic() < stop_at:
+        body = json.dumps({"document_id": documents[index % len(documents)]}).encode()
+        index += 1
+        started = time.perf_counter()
+        try:
+            connection.request('POST', path, body=body, headers=_headers(device, path, body))
+            response = connection.getresponse()
+            response.read()
+            local_statuses[response.status] += 1
+        except (OSError, http.client.HTTPException):
+            local_statuses['error'] += 1
+            connection.close()
+            continue
+        local_latencies.append(time.perf_counter() - started)
+
+    connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        statuses.update(local_statuses)
+
+
+def run_target(url, documents, kiosks, duration, device=None):
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    started = time.monotonic()
+    stop_at = started + duration
+
+    threads = [
+        threading.Thread(
+            target=_kiosk,
+            args=(url, documents, offset, stop_at, latencies, statuses, lock, device),
+            daemon=True,
+        )
+        for offset in range(kiosks)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - started
+    served = sum(count for status, count in statuses.items() if status in SERVED)
+    latencies.sort()
+
+    def percentile(fraction):
+        if not latencies:
+            return float('nan')
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+    return {
+        "requests": len(latencies),
+        "rps": served / elapsed,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else float('nan'),
+        "statuses": dict(statuses),
+        "rejected": sum(
+            count for status, count in statuses.items()
+            if status != 'error' and 400 <= status < 500 and status not in SERVED
+        ),
+    }
+
+
+def _documents(spec):
+    if '-' in spec:
+        first, last = (int(part) for part in spec.split('-', 1))
+        return list(range(first, last + 1))
+    return [int(part) for part in spec.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', action='append', required=True, metavar='LABEL=URL',
+                        help='endpoint to load, repeat to compare (e.g. wsgi=http://host:8000/attendance/checkin/)')
+    parser.add_argument('--documents', required=True,
+                        help='document ids of existing employees: "first-last" or "a,b,c"')
+    parser.add_argument('--kiosks', type=int, default=200, help='concurrent kiosks (default 200)')
+    parser.add_argument('--duration', type=float, default=30, help='seconds per target (default 30)')
+    parser.add_argument('--device-id', help='KioskDevice.device_id to sign requests as')
+    parser.add_argument('--device-secret', help='secret of that KioskDevice')
+    args = parser.parse_args()
+    if bool(args.device_id) != bool(args.device_secret):
+        parser.error('--device-id and --device-secret go together')
+
+    device = (args.device_id, args.device_secret) if args.device_id else None
+    documents = _documents(args.documents)
+    results = []
+    for target in args.target:
+        label, _, url = target.partition('=')
+        print(f"Loading {label} ({url}) with {args.kiosks} kiosks for {args.duration:g}s...")
+        results.append((label, run_target(url, documents, args.kiosks, args.duration, device)))
+
+    print()
+    print(f"{'target':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+    for label, result in results:
+        print(f"{label:<10}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+              f"{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}  {result['statuses']}")
+
+    if len(results) > 1 and results[0][1]['rps']:
+        baseline_label, baseline = results[0]
+        for label, result in results[1:]:
+            print(f"{label} vs {baseline_label}: {result['rps'] / baseline['rps']:.2f}x requests/sec")
+
+    rejected = [label for label, result in results if result['rejected']]
+    if rejected:
+        print(f"\nRequests rejected with 4xx by: {', '.join(rejected)}. "
+              "Check the document ids and whether the server requires signed swipes "
+              "(--device-id/--device-secret).", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from rightOnTime.shared_cache import is_shared
+
+
+def _alias():
+    return getattr(settings, 'ADMIN_AUTH_CACHE_ALIAS', 'default')
+
+
+def _cache():
+    return caches[_alias()]
+
+
+def _ttl():
+    return getattr(settings, 'ADMIN_AUTH_CACHE_TTL', 30)
+
+
+def _key(user_id):
+    return f'admin-auth:{user_id}'
+
+
+def forget_admin(user_id):
+    """Drop the cached status so the next request re-reads the administrator row."""
+    _cache().delete(_key(user_id))
+
+
+def admin_allowed(user_id):
+    """
+    Whether the administrator behind a token still exists and is active,
+    the check JWTAuthentication ran on every request. Read from the database
+    at most once per ADMIN_AUTH_CACHE_TTL seconds (30 by default) and user,
+    and dropped right away by forget_admin() on changes.
+
+    forget_admin() only reaches every worker through a shared cache. With a
+    per-process one (see rightOnTime.shared_cache) the row is read on every
+    request instead, so a deactivation is never served stale.
+    """
+    if not is_shared(_alias()):
+        return _allowed_in_database(user_id)
+    key = _key(user_id)
+    allowed = _cache().get(key)
+    if allowed is None:
+        allowed = _allowed_in_database(user_id)
+        _cache().set(key, allowed, _ttl())
+    return allowed
+
+
+def _allowed_in_database(user_id):
+    return get_user_model().objects.filter(pk=user_id, is_active=True).exists()
+
+
+class AdminTokenAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication without the per-request user SELECT. request.user is
+    a TokenUser built from the signed claims AdminLoginSerializer adds at
+    login (user id, username, is_staff). Deactivated or deleted
+    administrators are caught by a short-TTL revocation cache.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not admin_allowed(validated_token[api_settings.USER_ID_CLAIM]):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,110 @@
+"""
+Per-worker copy of the refresh-token blacklist.
+
+simplejwt checks every refresh against token_blacklist_blacklistedtoken
+(joined to the outstanding tokens). This keeps the JTIs of blacklisted,
+not yet expired tokens in a set instead. The set is loaded once. At most
+every TOKEN_BLACKLIST_SYNC_SECONDS (5 by default) it is topped up with the
+rows blacklisted since the previous sync, re-reading the last
+TOKEN_BLACKLIST_SYNC_OVERLAP seconds (60) so that a row whose transaction
+committed late is still seen. Every TOKEN_BLACKLIST_FULL_RELOAD_SECONDS
+(300) the whole live blacklist is read again, as a backstop for anything
+that committed later than the overlap.
+
+Tokens this worker blacklists itself are added right away. A refresh
+token rotated or blacklisted on another worker is still accepted by
+this one until its next sync, i.e. for up to TOKEN_BLACKLIST_SYNC_SECONDS
+(5 s by default); set it to 0 to check the table on every refresh.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+class BlacklistedJTICache:
+    def __init__(self, sync_seconds, overlap_seconds, full_reload_seconds):
+        self.sync_seconds = sync_seconds
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self.full_reload_seconds = full_reload_seconds
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._expires = {}  # jti -> expires_at
+            self._synced_since = None  # wall-clock start of the last sync
+            self._synced_at = None
+            self._loaded_at = None
+
+    def contains(self, jti):
+        self._sync_if_due()
+        with self._lock:
+            return jti in self._expires
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._expires[jti] = expires_at
+
+    def _sync_if_due(self):
+        with self._lock:
+            due = self._synced_at is None or time.monotonic() - self._synced_at >= self.sync_seconds
+        if due:
+            self.sync()
+
+    def sync(self):
+        now = timezone.now()
+        with self._lock:
+            since = self._synced_since
+            full = since is None or time.monotonic() - self._loaded_at >= self.full_reload_seconds
+
+        rows = BlacklistedToken.objects.order_by()
+        if full:
+            rows = rows.filter(token__expires_at__gt=now)
+        else:
+            rows = rows.filter(blacklisted_at__gte=since - self.overlap)
+        rows = list(rows.values_list('token__jti', 'token__expires_at'))
+
+        with self._lock:
+            # Blacklisting is never undone, so both kinds of sync only add
+            for jti, expires_at in rows:
+                if expires_at > now:
+                    self._expires[jti] = expires_at
+            # Expired tokens fail validation anyway; keep the set at one lifetime's worth
+            self._expires = {jti: expires for jti, expires in self._expires.items() if expires > now}
+            self._synced_since = now
+            self._synced_at = time.monotonic()
+            if full:
+                self._loaded_at = self._synced_at
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._expires), "synced_since": self._synced_since}
+
+
+blacklisted_jtis = BlacklistedJTICache(
+    sync_seconds=getattr(settings, 'TOKEN_BLACKLIST_SYNC_SECONDS', 5),
+    overlap_seconds=getattr(settings, 'TOKEN_BLACKLIST_SYNC_OVERLAP', 60),
+    full_reload_seconds=getattr(settings, 'TOKEN_BLACKLIST_FULL_RELOAD_SECONDS', 300),
+)
+
+
+class AdminRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check reads the per-worker JTI set."""
+
+    def check_blacklist(self):
+        if blacklisted_jtis.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklisted_jtis.add(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload['exp']))
+        return result
@@ -0,0 +1,104 @@
+"""
+Coalesced last_login writes for admin logins.
+
+With ADMIN_LAST_LOGIN_FLUSH_SECONDS set (> 0), a successful login only
+records (administrator id, time) in this worker's memory; a timer writes
+everything collected in one batched UPDATE every that many seconds, and
+once more when the worker exits (atexit, plus gunicorn's worker_exit hook).
+Repeated logins of the same shared account within an interval collapse to
+a single row update. A worker killed without a clean shutdown loses at
+most one interval of last_login values.
+
+Unset or 0 keeps simplejwt's synchronous update_last_login().
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _interval():
+    return getattr(settings, 'ADMIN_LAST_LOGIN_FLUSH_SECONDS', 0)
+
+
+class LastLoginBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # administrator pk -> last_login
+        self._timer = None
+        atexit.register(self.flush)
+
+    def record(self, user):
+        """Note a successful login of `user`; writes now if buffering is off."""
+        if not api_settings.UPDATE_LAST_LOGIN:
+            return
+        interval = _interval()
+        if not interval:
+            update_last_login(None, user)
+            return
+        with self._lock:
+            self._pending[user.pk] = timezone.now()
+            self._arm(interval)
+
+    def _arm(self, interval):
+        # Called with the lock held
+        if self._timer is None:
+            self._timer = threading.Timer(interval, self._flush_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write every buffered last_login in one UPDATE; returns the rows written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+
+        User = get_user_model()
+        try:
+            User.objects.bulk_update(
+                [User(pk=pk, last_login=when) for pk, when in pending.items()],
+                ['last_login'],
+            )
+        except Exception:
+            logger.exception('Could not write %d buffered last_login values', len(pending))
+            with self._lock:
+                # Keep them for the next flush unless a newer login replaced them
+                for pk, when in pending.items():
+                    self._pending.setdefault(pk, when)
+                if _interval():
+                    self._arm(_interval())
+            return 0
+        return len(pending)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread's own connection; nothing else would close it
+            connection.close()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def clear(self):
+        with self._lock:
+            self._pending = {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+last_login_buffer = LastLoginBuffer()
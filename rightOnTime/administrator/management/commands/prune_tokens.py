@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding refresh tokens and their blacklist entries, '
+        'a small chunk per transaction so logins and refreshes are never blocked for long. '
+        'Meant to run on a schedule (see k8s/prune-tokens-cronjob.yaml).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=getattr(settings, 'TOKEN_PRUNE_CHUNK_SIZE', 1000),
+            help='Tokens deleted per transaction (default 1000)',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.05,
+            help='Seconds to pause between chunks (default 0.05)',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = max(options['chunk_size'], 1)
+        pause = options['sleep']
+        # Fixed cutoff: tokens expiring while the command runs wait for the next run
+        now = timezone.now()
+
+        outstanding = blacklisted = 0
+        while True:
+            pks = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by().values_list('pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                # The blacklist rows go with their token (on_delete=CASCADE)
+                deleted = OutstandingToken.objects.filter(pk__in=pks).delete()[1]
+            outstanding += deleted.get(OutstandingToken._meta.label, 0)
+            blacklisted += deleted.get(BlacklistedToken._meta.label, 0)
+            time.sleep(pause)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Pruned {outstanding} expired tokens ({blacklisted} blacklisted).'
+        ))
@@ -1,19 +1,45 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenObtainSerializer, TokenRefreshSerializer
 from rest_framework import serializers
+from .blacklist import AdminRefreshToken
+from .last_login import last_login_buffer
 
 class AdminLoginSerializer(TokenObtainPairSerializer):
     """
     Custom JWT serializer that only allows staff users to login.
     Extends TokenObtainPairSerializer to add admin-only validation.
     """
+    token_class = AdminRefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        # Claims AdminTokenAuthentication builds request.user from, without a DB lookup
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['is_staff'] = user.is_staff
+        return token
     
     def validate(self, attrs):
-        # Validate credentials and generate JWT tokens
-        data = super().validate(attrs)
+        # Validate credentials (TokenObtainPairSerializer's own validate would
+        # also write last_login synchronously)
+        data = TokenObtainSerializer.validate(self, attrs)
         
         # Check if user is staff/admin
         if not self.user.is_staff:
             raise serializers.ValidationError({"detail": "Only administrators can login"})
         
-        # Return tokens if user is staff
-        return data
\ No newline at end of file
+        # Generate tokens if user is staff
+        refresh = self.get_token(self.user)
+        data["refresh"] = str(refresh)
+        data["access"] = str(refresh.access_token)
+
+        # Written now, or batched when ADMIN_LAST_LOGIN_FLUSH_SECONDS is set
+        last_login_buffer.record(self.user)
+        return data
+
+
+class AdminTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh (and rotate) an admin token pair. The blacklist check reads the
+    per-worker JTI set instead of the token_blacklist tables.
+    """
+    token_class = AdminRefreshToken
@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_admin
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def revoke_cached_admin_status(sender, instance, **kwargs):
+    """Deactivating or deleting an administrator takes effect on the next request."""
+    forget_admin(instance.pk)
@@ -1,4 +1,7 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
 from rest_framework import serializers as rest_serializers
 from .serializers import AdminLoginSerializer
@@ -63,3 +66,333 @@ class AdminLoginSerializerTest(TestCase):
         # Should raise validation error for invalid credentials
         with self.assertRaises(Exception):
             serializer.is_valid(raise_exception=True)
+
+
+class AdminTokenAuthenticationTest(APITestCase):
+    """Test cases for the stateless JWT authentication"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="token_admin",
+            email="token@test.com",
+            password="adminpass123",
+            id_administrator="ADMIN-TOKEN",
+            phone_number=3001234569,
+            is_staff=True
+        )
+        response = self.client.post('/auth/login/', {
+            'username': 'token_admin',
+            'password': 'adminpass123'
+        }, format='json')
+        self.access = response.data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def test_login_adds_user_claims(self):
+        """Test the access token carries the claims the stateless user is built from"""
+        token = AccessToken(self.access)
+        self.assertEqual(token['username'], "token_admin")
+        self.assertTrue(token['is_staff'])
+
+    def test_polling_skips_the_user_lookup(self):
+        """Test only the first request in the TTL reads the administrator row"""
+        with self.assertNumQueries(1):
+            response = self.client.get('/employees/cache-stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get('/employees/cache-stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.wsgi_request.user.username, "token_admin")
+
+    def test_deactivation_revokes_immediately(self):
+        """Test a deactivated administrator's token stops working on the next request"""
+        self.client.get('/employees/cache-stats/')
+        self.admin.is_active = False
+        self.admin.save()
+        response = self.client.get('/employees/cache-stats/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_cache_expires(self):
+        """Test changes made behind the ORM's back are picked up after the TTL"""
+        from django.core.cache import cache
+        self.client.get('/employees/cache-stats/')
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/employees/cache-stats/').status_code, status.HTTP_200_OK)
+        cache.clear()  # what the TTL does
+        self.assertEqual(self.client.get('/employees/cache-stats/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(SINGLE_PROCESS=False)
+    def test_per_process_cache_is_not_trusted(self):
+        """Test several workers on a local-memory cache read the administrator row every time"""
+        self.client.get('/employees/cache-stats/')
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/employees/cache-stats/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AdminTokenRefreshTest(APITestCase):
+    """Test cases for refresh rotation and the in-memory blacklist"""
+
+    def setUp(self):
+        User.objects.create_user(
+            username="refresh_admin",
+            email="refresh@test.com",
+            password="adminpass123",
+            id_administrator="ADMIN-REFRESH",
+            phone_number=3001234570,
+            is_staff=True
+        )
+        response = self.client.post('/auth/login/', {
+            'username': 'refresh_admin',
+            'password': 'adminpass123'
+        }, format='json')
+        self.refresh = response.data['refresh']
+
+    def test_rotation_rejects_the_old_token(self):
+        """Test a rotated refresh token cannot be used again"""
+        response = self.client.post('/auth/refresh/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.data)
+        self.assertNotEqual(response.data['refresh'], self.refresh)
+
+        response = self.client.post('/auth/refresh/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_blacklist_check_skips_the_table_between_syncs(self):
+        """Test only the first check in a sync interval reads the blacklist"""
+        from .blacklist import AdminRefreshToken
+        with self.assertNumQueries(1):
+            AdminRefreshToken(self.refresh)
+        with self.assertNumQueries(0):
+            AdminRefreshToken(self.refresh)
+
+    def test_sync_picks_up_other_workers_blacklist(self):
+        """Test a token blacklisted elsewhere is rejected after the next sync"""
+        from rest_framework_simplejwt.exceptions import TokenError
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from .blacklist import AdminRefreshToken, blacklisted_jtis
+
+        token = AdminRefreshToken(self.refresh)
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        blacklisted_jtis.sync()
+        with self.assertRaises(TokenError):
+            AdminRefreshToken(self.refresh)
+
+
+    def _blacklist_elsewhere(self, age):
+        """Blacklist the token as another worker whose row committed `age` late."""
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from .blacklist import AdminRefreshToken
+        jti = AdminRefreshToken(self.refresh)['jti']
+        row = BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+        BlacklistedToken.objects.filter(pk=row.pk).update(blacklisted_at=timezone.now() - age)
+        return jti
+
+    def test_sync_picks_up_rows_committed_out_of_order(self):
+        """Test a row stamped before the last sync but committed after it is still seen"""
+        from datetime import timedelta
+        from .blacklist import BlacklistedJTICache
+        cache = BlacklistedJTICache(sync_seconds=0, overlap_seconds=60, full_reload_seconds=3600)
+        cache.sync()
+        jti = self._blacklist_elsewhere(timedelta(seconds=30))
+        self.assertTrue(cache.contains(jti))
+
+    def test_full_reload_catches_what_the_overlap_missed(self):
+        """Test the periodic full reload picks up rows older than the overlap"""
+        from datetime import timedelta
+        from .blacklist import BlacklistedJTICache
+        cache = BlacklistedJTICache(sync_seconds=0, overlap_seconds=60, full_reload_seconds=3600)
+        cache.sync()
+        jti = self._blacklist_elsewhere(timedelta(minutes=10))
+        self.assertFalse(cache.contains(jti))
+        cache.full_reload_seconds = 0
+        self.assertTrue(cache.contains(jti))
+
+
+class PruneTokensCommandTest(TestCase):
+    """Test cases for the prune_tokens management command"""
+
+    def test_prunes_only_expired_tokens(self):
+        """Test expired tokens and their blacklist rows go, live ones stay"""
+        from datetime import timedelta
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+        now = timezone.now()
+        for i in range(5):
+            expired = OutstandingToken.objects.create(
+                jti=f'expired-{i}', token='x', expires_at=now - timedelta(hours=1)
+            )
+            BlacklistedToken.objects.create(token=expired)
+        OutstandingToken.objects.create(jti='live', token='x', expires_at=now + timedelta(hours=1))
+
+        out = StringIO()
+        call_command('prune_tokens', chunk_size=2, sleep=0, stdout=out)
+
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertIn('Pruned 5 expired tokens (5 blacklisted)', out.getvalue())
+
+
+@override_settings(LOGIN_MAX_FAILURES=3, LOGIN_MAX_FAILURES_PER_IP=5)
+class AdminLoginThrottleTest(APITestCase):
+    """Test cases for the failed-login lockout"""
+
+    def setUp(self):
+        User.objects.create_user(
+            username="throttle_admin",
+            email="throttle@test.com",
+            password="adminpass123",
+            id_administrator="ADMIN-THROTTLE",
+            phone_number=3001234571,
+            is_staff=True
+        )
+
+    def login(self, username="throttle_admin", password="wrongpass", **extra):
+        return self.client.post('/auth/login/', {
+            'username': username,
+            'password': password
+        }, format='json', **extra)
+
+    def test_lockout_after_repeated_failures(self):
+        """Test the username is locked from this IP once the limit is reached"""
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.login(password="adminpass123")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    def test_non_object_bodies_are_a_400(self):
+        """Test JSON arrays and scalars are rejected before the lockout lookup"""
+        for body in ([1], "throttle_admin", 5):
+            response = self.client.post('/auth/login/', body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, body)
+        response = self.client.post('/auth/login/', {'username': 5, 'password': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_locked_attempts_skip_the_hash(self):
+        """Test rejected attempts never reach the password check"""
+        from unittest import mock
+        from .throttling import login_throttle
+        for _ in range(3):
+            self.login()
+        with mock.patch('rest_framework_simplejwt.serializers.authenticate') as check:
+            self.login()
+        check.assert_not_called()
+        self.assertEqual(login_throttle.stats(), {"rejected": 1, "hashed": 3})
+
+    def test_login_stats_endpoint(self):
+        """Test the lockout counters are reported to administrators"""
+        for _ in range(4):
+            self.login()
+        self.assertEqual(self.client.get('/auth/login-stats/').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(user=User.objects.get(username="throttle_admin"))
+        response = self.client.get('/auth/login-stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"rejected": 1, "hashed": 3})
+
+    def test_other_clients_are_not_locked_out(self):
+        """Test a lockout from one IP does not block the same username elsewhere"""
+        for _ in range(3):
+            self.login()
+        response = self.login(password="adminpass123", REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_spoofed_forwarded_for_does_not_reset_the_count(self):
+        """Test a new X-Forwarded-For per attempt still hits the lockout"""
+        for i in range(3):
+            self.assertEqual(self.login(HTTP_X_FORWARDED_FOR=f'203.0.113.{i}').status_code, 401)
+        response = self.login(password="adminpass123", HTTP_X_FORWARDED_FOR='203.0.113.99')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(LOGIN_MAX_FAILURES_PER_USERNAME=4)
+    def test_username_lockout_across_ips(self):
+        """Test one account guessed from many addresses is locked everywhere"""
+        for i in range(4):
+            self.assertEqual(self.login(REMOTE_ADDR=f'10.0.1.{i}').status_code, 401)
+        response = self.login(password="adminpass123", REMOTE_ADDR='10.0.1.99')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_ip_lockout_across_usernames(self):
+        """Test one IP cycling through usernames is locked out"""
+        for i in range(5):
+            self.login(username=f"guess{i}")
+        self.assertEqual(self.login(password="adminpass123").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_success_clears_failures(self):
+        """Test a correct password resets the username's failure count"""
+        self.login()
+        self.login()
+        self.assertEqual(self.login(password="adminpass123").status_code, status.HTTP_200_OK)
+        self.login()
+        self.login()
+        self.assertEqual(self.login(password="adminpass123").status_code, status.HTTP_200_OK)
+
+
+class LastLoginBufferTest(APITestCase):
+    """Test cases for the buffered last_login writes"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="shift_admin",
+            email="shift@test.com",
+            password="adminpass123",
+            id_administrator="ADMIN-SHIFT",
+            phone_number=3001234572,
+            is_staff=True
+        )
+
+    def login(self):
+        return self.client.post('/auth/login/', {
+            'username': 'shift_admin',
+            'password': 'adminpass123'
+        }, format='json')
+
+    def test_synchronous_by_default(self):
+        """Test last_login is written during the login without the setting"""
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.admin.refresh_from_db()
+        self.assertIsNotNone(self.admin.last_login)
+
+    @override_settings(ADMIN_LAST_LOGIN_FLUSH_SECONDS=60)
+    def test_buffered_logins_flush_in_one_update(self):
+        """Test buffered logins leave the row alone until the flush writes them at once"""
+        from .last_login import last_login_buffer
+        other = User.objects.create_user(
+            username="shift_admin2",
+            email="shift2@test.com",
+            password="adminpass123",
+            id_administrator="ADMIN-SHIFT2",
+            phone_number=3001234573,
+            is_staff=True
+        )
+        self.login()
+        self.login()
+        self.client.post('/auth/login/', {'username': 'shift_admin2', 'password': 'adminpass123'}, format='json')
+        self.admin.refresh_from_db()
+        self.assertIsNone(self.admin.last_login)
+        self.assertEqual(last_login_buffer.pending(), 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(last_login_buffer.flush(), 2)
+        self.admin.refresh_from_db()
+        other.refresh_from_db()
+        self.assertIsNotNone(self.admin.last_login)
+        self.assertIsNotNone(other.last_login)
+        self.assertEqual(last_login_buffer.pending(), 0)
+
+    @override_settings(ADMIN_LAST_LOGIN_FLUSH_SECONDS=60)
+    def test_non_staff_login_records_nothing(self):
+        """Test a rejected non-staff login does not touch last_login"""
+        from .last_login import last_login_buffer
+        User.objects.create_user(
+            username="clerk",
+            email="clerk@test.com",
+            password="clerkpass123",
+            id_administrator="CLERK001",
+            phone_number=3001234574
+        )
+        response = self.client.post('/auth/login/', {'username': 'clerk', 'password': 'clerkpass123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(last_login_buffer.pending(), 0)
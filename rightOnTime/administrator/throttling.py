@@ -0,0 +1,113 @@
+"""
+Failed-login lockout for /auth/login/, checked before any password is hashed.
+
+Failures are counted in the cache under three keys: the username from a
+given client IP, the client IP alone (a script walking through
+usernames), and the username alone with a much looser limit (one account
+guessed from many addresses). A key that reaches its limit within
+LOGIN_FAILURE_WINDOW seconds is locked for LOGIN_LOCKOUT_SECONDS. While it
+is locked, attempts are answered with a 429 after one cache read, without
+a PBKDF2 round. The tight limit is on the username+IP pair, so a third
+party can only lock an administrator out everywhere by spending
+LOGIN_MAX_FAILURES_PER_USERNAME attempts.
+
+The client IP is DRF's get_ident(): REMOTE_ADDR unless
+REST_FRAMEWORK['NUM_PROXIES'] says how many trusted proxies append to
+X-Forwarded-For, so a spoofed header does not yield fresh keys.
+
+The counters live in CACHES[LOGIN_THROTTLE_CACHE_ALIAS], the Redis cache
+when REDIS_URL is set, so the limits hold across workers and replicas.
+With a per-process cache every worker counts on its own; the
+rightOnTime.W001 check warns about that at startup.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+def _cache():
+    return caches[getattr(settings, 'LOGIN_THROTTLE_CACHE_ALIAS', 'default')]
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _digest(value):
+    return hashlib.sha1(value.encode()).hexdigest()
+
+
+class LoginThrottle:
+    def __init__(self):
+        self.rejected = 0
+        self.hashed = 0
+        self._lock = threading.Lock()
+
+    def keys(self, request, username):
+        """(username+IP key, IP key, username key) for a login request."""
+        ident = BaseThrottle().get_ident(request) or '-'
+        username = str(username or "").strip().lower()
+        return (
+            f'login-throttle:user:{_digest(f"{username}|{ident}")}',
+            f'login-throttle:ip:{_digest(ident)}',
+            f'login-throttle:username:{_digest(username)}',
+        )
+
+    def _limits(self):
+        return (
+            _setting('LOGIN_MAX_FAILURES', 5),
+            _setting('LOGIN_MAX_FAILURES_PER_IP', 20),
+            _setting('LOGIN_MAX_FAILURES_PER_USERNAME', 50),
+        )
+
+    def retry_after(self, keys):
+        """Seconds until the longest lockout among `keys` ends, or None if none is locked."""
+        locked = _cache().get_many([f'{key}:locked' for key in keys])
+        if not locked:
+            return None
+        return max(1, math.ceil(max(locked.values()) - time.time()))
+
+    def failed(self, keys):
+        """Count a failed attempt; lock every key that reached its limit."""
+        backend = _cache()
+        window = _setting('LOGIN_FAILURE_WINDOW', 900)
+        lockout = _setting('LOGIN_LOCKOUT_SECONDS', 900)
+        for key, limit in zip(keys, self._limits()):
+            backend.add(key, 0, window)
+            try:
+                failures = backend.incr(key)
+            except ValueError:
+                # Expired between add() and incr()
+                backend.set(key, 1, window)
+                failures = 1
+            if failures >= limit:
+                backend.set(f'{key}:locked', time.time() + lockout, lockout)
+                backend.delete(key)
+
+    def succeeded(self, keys):
+        """A correct password clears the username's failures (not the IP's)."""
+        _cache().delete(keys[0])
+
+    def count(self, rejected):
+        with self._lock:
+            if rejected:
+                self.rejected += 1
+            else:
+                self.hashed += 1
+
+    def stats(self):
+        with self._lock:
+            return {"rejected": self.rejected, "hashed": self.hashed}
+
+    def reset_stats(self):
+        with self._lock:
+            self.rejected = 0
+            self.hashed = 0
+
+
+login_throttle = LoginThrottle()
@@ -1,11 +1,59 @@
+from collections.abc import Mapping
+
+from django.contrib.auth import get_user_model
 from django.shortcuts import render
-from rest_framework_simplejwt.views import TokenObtainPairView
-from .serializers import AdminLoginSerializer
+from rest_framework.exceptions import AuthenticationFailed, ParseError, Throttled
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .serializers import AdminLoginSerializer, AdminTokenRefreshSerializer
+from .throttling import login_throttle
 
 # Create your views here.
 class AdminLoginView(TokenObtainPairView):
     """
     Admin-only login endpoint that generates JWT tokens.
     Uses AdminLoginSerializer to restrict access to staff users only.
+    Repeated failures lock the username+IP (and the IP) out before any
+    password is hashed; see administrator.throttling.
+    """
+    serializer_class = AdminLoginSerializer  # Custom serializer with is_staff validation.
+
+    def post(self, request, *args, **kwargs):
+        if not isinstance(request.data, Mapping):
+            raise ParseError("Se esperaba un objeto con las credenciales.")
+        keys = login_throttle.keys(request, request.data.get(get_user_model().USERNAME_FIELD))
+        wait = login_throttle.retry_after(keys)
+        if wait is not None:
+            login_throttle.count(rejected=True)
+            raise Throttled(wait=wait, detail="Demasiados intentos fallidos, intente más tarde.")
+
+        login_throttle.count(rejected=False)
+        try:
+            response = super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            login_throttle.failed(keys)
+            raise
+        if response.status_code == 200:
+            login_throttle.succeeded(keys)
+        return response
+
+
+class LoginStatsView(APIView):
+    """
+    This worker's login attempts turned away by the lockout before hashing
+    ("rejected") and checked against the password ("hashed").
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(login_throttle.stats())
+
+
+class AdminTokenRefreshView(TokenRefreshView):
+    """
+    Exchanges a refresh token for a new access token. With ROTATE_REFRESH_TOKENS
+    and BLACKLIST_AFTER_ROTATION the old refresh token is blacklisted.
     """
-    serializer_class = AdminLoginSerializer  # Custom serializer with is_staff validation.
\ No newline at end of file
+    serializer_class = AdminTokenRefreshSerializer
@@ -1,3 +1,61 @@
 from django.contrib import admin
+from django.db import transaction
 
-# Register your models here.
+from rightOnTime.response_cache import bump
+from . import summary
+from .models import Attendance, DailyAttendanceSummary, KioskDevice
+
+
+@admin.register(Attendance)
+class AttendanceAdmin(admin.ModelAdmin):
+    """
+    Attendance edits from the admin move the daily summary by the difference
+    between the old and new rows, read under a row lock, in the same
+    transaction as the change.
+    """
+    list_display = ('id_attendance', 'employee', 'date', 'check_in_time', 'check_out_time', 'status', 'device')
+    list_filter = ('status', 'date', 'device')
+    list_select_related = ('employee', 'device')
+
+    def _locked_rows(self, queryset):
+        return list(queryset.select_for_update().values_list(*summary.ROW_FIELDS))
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            previous = self._locked_rows(Attendance.objects.filter(pk=obj.pk)) if change else []
+            if not change or (form is not None and 'employee' in form.changed_data):
+                obj.role = obj.employee.role or ''
+            super().save_model(request, obj, form, change)
+            summary.record_changes(
+                removed=previous,
+                added=[(obj.date, obj.role, obj.check_in_time, obj.check_out_time)]
+            )
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            previous = self._locked_rows(Attendance.objects.filter(pk=obj.pk))
+            super().delete_model(request, obj)
+            summary.record_changes(removed=previous)
+        bump('attendance')
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            previous = self._locked_rows(queryset)
+            super().delete_queryset(request, queryset)
+            summary.record_changes(removed=previous)
+        bump('attendance')
+
+
+@admin.register(DailyAttendanceSummary)
+class DailyAttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ('date', 'role', 'checked_in', 'late', 'checked_out', 'minutes_worked')
+    list_filter = ('role',)
+    readonly_fields = ('date', 'role', 'checked_in', 'late', 'checked_out', 'minutes_worked', 'updated_at')
+
+
+@admin.register(KioskDevice)
+class KioskDeviceAdmin(admin.ModelAdmin):
+    """Register kiosks; the generated secret is what the device signs with."""
+    list_display = ('device_id', 'name', 'is_active', 'created_at')
+    list_filter = ('is_active',)
+    search_fields = ('device_id', 'name')
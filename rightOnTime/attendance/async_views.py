@@ -0,0 +1,150 @@
+"""
+Native async versions of the kiosk and listing endpoints.
+
+DRF's @api_view is sync-only, so these are plain Django async views that
+keep the same payloads, messages and status codes.
+
+Experimental. Django's async ORM still runs each query on a single sync
+thread per worker, so the ASGI profile (SERVER_PROFILE=asgi) can only help
+when queries spend their time waiting on a remote database, such as the
+Postgres pooler. Against a local database it is slower than the sync views
+(benchmarks/kiosk_load.py). Measure it there before switching production.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import AuthenticationFailed, NotFound, ValidationError
+from rest_framework.request import Request
+
+from administrator.authentication import AdminTokenAuthentication
+from employees.cache import employee_cache
+from rightOnTime.conditional import arequest_etag, not_modified, set_validators
+from rightOnTime.sparse_fields import select_values, sparse_fields, strip_values
+from .authentication import AUTH_SCHEME, aauthenticate_kiosk, device_auth_required
+from .filters import ATTENDANCE_FIELDS, filter_attendance
+from .models import Attendance
+from .pagination import AttendancePagination
+from .services import arecord_check_in, arecord_check_out
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=DjangoJSONEncoder)
+
+
+def _document_id(request):
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return payload.get('document_id') if isinstance(payload, dict) else None
+    return request.POST.get('document_id')
+
+
+async def _authenticate(request):
+    """Run the project's JWT authentication; returns an error response or None."""
+    try:
+        result = await sync_to_async(AdminTokenAuthentication().authenticate)(request)
+    except AuthenticationFailed as exc:
+        return _json({"detail": exc.detail}, status=401)
+    if result is None:
+        return _json({"detail": "Authentication credentials were not provided."}, status=401)
+    request.user = result[0]
+    return None
+
+
+async def _authenticate_kiosk(request):
+    """
+    Verify a kiosk signature like KioskDeviceAuthentication does; returns
+    (device or None, error response or None).
+    """
+    try:
+        device = await aauthenticate_kiosk(request)
+    except AuthenticationFailed as exc:
+        error = _json({"detail": exc.detail}, status=401)
+    else:
+        if device is not None or not device_auth_required():
+            return device, None
+        error = _json({"detail": "Authentication credentials were not provided."}, status=401)
+    error['WWW-Authenticate'] = AUTH_SCHEME
+    return None, error
+
+
+@csrf_exempt
+@require_POST
+async def check_in(request):
+    device, error = await _authenticate_kiosk(request)
+    if error is not None:
+        return error
+
+    document_id = _document_id(request)
+
+    if not document_id:
+        return _json({"error": "document_id requerido"}, status=400)
+
+    employee = await employee_cache.aget(document_id)
+
+    if employee is None:
+        return _json({"error": "Empleado no existe"}, status=404)
+
+    if not await arecord_check_in(employee, device=device):
+        return _json({"error": "Este empleado ya tiene asistencia hoy"}, status=409)
+
+    return _json({"message": "Entrada registrada correctamente"})
+
+
+@csrf_exempt
+@require_POST
+async def check_out(request):
+    _, error = await _authenticate_kiosk(request)
+    if error is not None:
+        return error
+
+    document_id = _document_id(request)
+
+    if not document_id:
+        return _json({"error": "document_id requerido"}, status=400)
+
+    employee = await employee_cache.aget(document_id)
+
+    if employee is None:
+        return _json({"error": "Empleado no existe"}, status=404)
+
+    if not await arecord_check_out(employee):
+        return _json({"error": "No hay check-in registrado hoy"}, status=409)
+
+    return _json({"message": "Salida registrada correctamente"})
+
+
+@require_GET
+async def list_all_attendance(request):
+    error = await _authenticate(request)
+    if error is not None:
+        return error
+
+    api_request = Request(request)
+    paginator = AttendancePagination()
+    try:
+        etag = await arequest_etag(request, ['attendance'])
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
+        fields = sparse_fields(api_request.query_params, ATTENDANCE_FIELDS)
+        queryset = select_values(Attendance.objects, fields, paginator.ordering)
+        queryset = filter_attendance(queryset, api_request.query_params)
+        page = paginator.get_page_queryset(queryset, api_request)
+    except ValidationError as exc:
+        return _json(exc.detail, status=400)
+    except NotFound as exc:
+        return _json({"detail": exc.detail}, status=404)
+
+    data = paginator.set_page([row async for row in page])
+    response = _json(strip_values(data, fields))
+    set_validators(response, etag)
+    for header, value in paginator.get_pagination_headers().items():
+        response[header] = value
+    return response
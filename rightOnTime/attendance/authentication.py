@@ -0,0 +1,146 @@
+"""
+HMAC authentication for kiosk devices on the check-in endpoints.
+
+A kiosk sends four headers with each swipe:
+
+    X-Kiosk-Device     its device_id
+    X-Kiosk-Timestamp  Unix time in seconds
+    X-Kiosk-Nonce      a random string, new for every request
+    X-Kiosk-Signature  hex HMAC-SHA256, keyed with the device secret, of
+                       "{timestamp}\\n{nonce}\\n{METHOD}\\n{path}\\n" + raw body
+
+The device secret comes from an in-memory copy of the device table
+(attendance.devices), so verifying a swipe costs no query. A timestamp
+outside KIOSK_SIGNATURE_WINDOW seconds is rejected. A nonce seen within
+the window is rejected as a replay. Nonces live in
+CACHES[KIOSK_NONCE_CACHE_ALIAS]; only a shared backend catches a replay
+sent to another worker, so signed requests are refused while that cache
+is per process (see rightOnTime.shared_cache).
+
+Requests without an X-Kiosk-Device header are not authenticated here.
+KIOSK_REQUIRE_DEVICE_AUTH decides whether they are still accepted. It is
+False by default, so kiosks without a key keep working while devices are
+registered; turn it on (env KIOSK_REQUIRE_DEVICE_AUTH=True) once every
+kiosk signs its requests.
+"""
+import hashlib
+import hmac
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import BasePermission
+
+from rightOnTime.shared_cache import is_shared
+from .devices import CachedDevice, device_cache
+
+AUTH_SCHEME = 'Kiosk-HMAC'
+
+
+def _nonces():
+    alias = getattr(settings, 'KIOSK_NONCE_CACHE_ALIAS', 'default')
+    if not is_shared(alias):
+        # A replay sent to another worker would not be seen; refuse rather than accept it
+        raise AuthenticationFailed("El servidor no puede verificar firmas de dispositivos")
+    return caches[alias]
+
+
+def _window():
+    return getattr(settings, 'KIOSK_SIGNATURE_WINDOW', 30)
+
+
+def device_auth_required():
+    return getattr(settings, 'KIOSK_REQUIRE_DEVICE_AUTH', False)
+
+
+def sign(secret, timestamp, nonce, method, path, body):
+    """Hex signature a kiosk sends for this request."""
+    message = f'{timestamp}\n{nonce}\n{method.upper()}\n{path}\n'.encode() + body
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def _credentials(request):
+    """The signature headers, None without X-Kiosk-Device, or AuthenticationFailed."""
+    device_id = request.META.get('HTTP_X_KIOSK_DEVICE')
+    if not device_id:
+        return None
+    timestamp = request.META.get('HTTP_X_KIOSK_TIMESTAMP', '')
+    nonce = request.META.get('HTTP_X_KIOSK_NONCE', '')
+    signature = request.META.get('HTTP_X_KIOSK_SIGNATURE', '')
+    if not (timestamp and nonce and signature):
+        raise AuthenticationFailed("Firma del dispositivo incompleta")
+    return device_id, timestamp, nonce, signature
+
+
+def _verify(request, device, timestamp, nonce, signature):
+    """Check the clock and the signature; returns the nonce cache key."""
+    if device is None:
+        raise AuthenticationFailed("Dispositivo no registrado")
+    try:
+        skew = abs(time.time() - int(timestamp))
+    except ValueError:
+        skew = None
+    if skew is None or skew > _window():
+        raise AuthenticationFailed("Marca de tiempo fuera de la ventana permitida")
+
+    expected = sign(device.secret, timestamp, nonce, request.method, request.get_full_path(), request.body)
+    if not hmac.compare_digest(expected, signature):
+        raise AuthenticationFailed("Firma del dispositivo inválida")
+    return f'kiosk-nonce:{device.pk}:{hashlib.sha1(nonce.encode()).hexdigest()}'
+
+
+def _nonce_timeout():
+    # A timestamp is accepted up to one window on either side of the clock
+    return 2 * _window() + 1
+
+
+def authenticate_kiosk(request):
+    """The CachedDevice that signed `request`, or None if it is unsigned."""
+    credentials = _credentials(request)
+    if credentials is None:
+        return None
+    device_id, timestamp, nonce, signature = credentials
+    device = device_cache.get(device_id)
+    key = _verify(request, device, timestamp, nonce, signature)
+    if not _nonces().add(key, 1, _nonce_timeout()):
+        raise AuthenticationFailed("Petición repetida")
+    return device
+
+
+async def aauthenticate_kiosk(request):
+    """Async variant of authenticate_kiosk() for the ASGI views."""
+    credentials = _credentials(request)
+    if credentials is None:
+        return None
+    device_id, timestamp, nonce, signature = credentials
+    device = await device_cache.aget(device_id)
+    key = _verify(request, device, timestamp, nonce, signature)
+    if not await _nonces().aadd(key, 1, _nonce_timeout()):
+        raise AuthenticationFailed("Petición repetida")
+    return device
+
+
+class KioskDeviceAuthentication(BaseAuthentication):
+    """
+    DRF authentication for kiosk swipes. request.user stays anonymous;
+    request.auth is the CachedDevice that signed the request.
+    """
+
+    def authenticate(self, request):
+        device = authenticate_kiosk(request)
+        if device is None:
+            return None
+        return AnonymousUser(), device
+
+    def authenticate_header(self, request):
+        return AUTH_SCHEME
+
+
+class IsKioskDevice(BasePermission):
+    """Signed by a registered kiosk, or any caller while KIOSK_REQUIRE_DEVICE_AUTH is off."""
+
+    def has_permission(self, request, view):
+        return isinstance(request.auth, CachedDevice) or not device_auth_required()
@@ -0,0 +1,173 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from employees.cache import parse_document_id
+from employees.models import Employee
+from rightOnTime.response_cache import bump
+from . import summary
+from .models import Attendance
+
+CHECK_IN = 'checkin'
+CHECK_OUT = 'checkout'
+
+
+def _event_result(index, event, status, body):
+    event = event if isinstance(event, dict) else {}
+    return {
+        "index": index,
+        "document_id": event.get('document_id'),
+        "kind": event.get('kind'),
+        "status": status,
+        **body,
+    }
+
+
+def _parse_event(event):
+    """
+    Validate a single kiosk event.
+    Returns (document_id, kind, local datetime) or an error message.
+    """
+    if not isinstance(event, dict):
+        return "Evento inválido"
+
+    document_id = parse_document_id(event.get('document_id'))
+    if document_id is None:
+        return "document_id requerido"
+
+    kind = event.get('kind')
+    if kind not in (CHECK_IN, CHECK_OUT):
+        return "kind debe ser 'checkin' o 'checkout'"
+
+    try:
+        moment = parse_datetime(event.get('client_timestamp'))
+    except (TypeError, ValueError):
+        moment = None
+    if moment is None:
+        return "client_timestamp inválido"
+    if timezone.is_aware(moment):
+        moment = timezone.localtime(moment).replace(tzinfo=None)
+
+    return document_id, kind, moment
+
+
+def _apply_events(parsed, device_id):
+    """
+    Resolve employees and their attendance rows with one IN query each, then write all
+    new check-ins with bulk_create and all check-outs with bulk_update. The
+    existing rows are locked while read, and the summary gets per-row deltas.
+    """
+    results = {}
+    document_ids = {doc for _, (doc, _, _) in parsed}
+    employees = {
+        document_id: (pk, role or '')
+        for document_id, pk, role in Employee.objects.filter(
+            document_id__in=document_ids
+        ).order_by().values_list('document_id', 'pk', 'role')
+    }
+
+    with transaction.atomic():
+        dates = {moment.date() for _, (_, _, moment) in parsed}
+        existing = {
+            (employee_id, day): (pk, (day, role, check_in_time, check_out_time))
+            for pk, employee_id, day, role, check_in_time, check_out_time in Attendance.objects.filter(
+                employee_id__in=[pk for pk, _ in employees.values()], date__in=dates
+            ).select_for_update().values_list('pk', 'employee_id', *summary.ROW_FIELDS)
+        }
+
+        to_create = {}
+        to_update = {}
+        now = timezone.now()
+
+        # Chronological order, so a buffered check-in precedes its check-out
+        for index, (document_id, kind, moment) in sorted(parsed, key=lambda item: item[1][2]):
+            if document_id not in employees:
+                results[index] = (404, {"error": "Empleado no existe"})
+                continue
+            employee_id, role = employees[document_id]
+
+            key = (employee_id, moment.date())
+
+            if kind == CHECK_IN:
+                if key in existing or key in to_create:
+                    results[index] = (409, {"error": "Este empleado ya tiene asistencia hoy"})
+                    continue
+                to_create[key] = Attendance(
+                    id_attendance=f"A-{moment.timestamp()}-{employee_id}",
+                    employee_id=employee_id,
+                    device_id=device_id,
+                    role=role,
+                    date=moment.date(),
+                    check_in_time=moment.time(),
+                    created_at=now
+                )
+                results[index] = (200, {"message": "Entrada registrada correctamente"})
+                continue
+
+            if key in to_create:
+                to_create[key].check_out_time = moment.time()
+            elif key in existing:
+                pk, (_, _, _, check_out_time) = existing[key]
+                to_update[key] = Attendance(
+                    pk=pk,
+                    previous_check_out_time=check_out_time,
+                    check_out_time=moment.time(),
+                    updated_at=now
+                )
+            else:
+                results[index] = (409, {"error": "No hay check-in registrado hoy"})
+                continue
+            results[index] = (200, {"message": "Salida registrada correctamente"})
+
+        Attendance.objects.bulk_create(to_create.values())
+        Attendance.objects.bulk_update(
+            to_update.values(), ['previous_check_out_time', 'check_out_time', 'updated_at'], batch_size=500
+        )
+        added = [(row.date, row.role, row.check_in_time, row.check_out_time) for row in to_create.values()]
+        removed = []
+        for key, row in to_update.items():
+            day, role, check_in_time, check_out_time = existing[key][1]
+            removed.append((day, role, check_in_time, check_out_time))
+            added.append((day, role, check_in_time, row.check_out_time))
+        summary.record_changes(removed=removed, added=added)
+        bump('attendance')
+
+    return results
+
+
+def process_events(events, device=None):
+    """
+    Apply a backlog of kiosk swipes ({document_id, client_timestamp, kind}),
+    tagging new check-ins with the kiosk `device` that sent them, if any.
+    Returns one result per event, in the order they were received.
+    """
+    device_id = device.pk if device else None
+    results = [None] * len(events)
+    parsed = []
+
+    for index, event in enumerate(events):
+        outcome = _parse_event(event)
+        if isinstance(outcome, str):
+            results[index] = _event_result(index, event, 400, {"error": outcome})
+        else:
+            parsed.append((index, outcome))
+
+    if parsed:
+        try:
+            applied = _apply_events(parsed, device_id)
+        except IntegrityError:
+            # A live swipe inserted one of our rows between the read and the
+            # write; run once more so it is reported as a conflict.
+            try:
+                applied = _apply_events(parsed, device_id)
+            except IntegrityError:
+                # Still racing live swipes: nothing was written, let the kiosk resend
+                applied = {
+                    index: (409, {"error": "Conflicto con otra marcación, reintente el lote"})
+                    for index, _ in parsed
+                }
+
+        for index, (status, body) in applied.items():
+            results[index] = _event_result(index, events[index], status, body)
+
+    return results
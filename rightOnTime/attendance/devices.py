@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import KioskDevice
+
+CachedDevice = namedtuple('CachedDevice', ['pk', 'device_id', 'secret'])
+
+
+class KioskDeviceCache:
+    """
+    Per-worker copy of the active kiosk devices (device_id -> pk, secret).
+    The table is small, so it is loaded whole and reloaded every `ttl`
+    seconds; device edits in this worker clear it right away via signals.
+    Swipes never wait on a device lookup in between.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._devices = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def get(self, device_id):
+        """Return the CachedDevice for an active `device_id`, or None."""
+        devices = self._current()
+        if devices is None:
+            devices = self._load()
+        return devices.get(device_id)
+
+    async def aget(self, device_id):
+        """Async variant of get(); only a reload leaves the event loop."""
+        devices = self._current()
+        if devices is None:
+            devices = await sync_to_async(self._load)()
+        return devices.get(device_id)
+
+    def _current(self):
+        with self._lock:
+            if self._devices is not None and self._expires_at > time.monotonic():
+                return self._devices
+            return None
+
+    def _load(self):
+        rows = KioskDevice.objects.filter(is_active=True).order_by().values_list('pk', 'device_id', 'secret')
+        devices = {device_id: CachedDevice(pk, device_id, secret) for pk, device_id, secret in rows}
+        with self._lock:
+            self._devices = devices
+            self._expires_at = time.monotonic() + self.ttl
+        return devices
+
+    def clear(self):
+        with self._lock:
+            self._devices = None
+            self._expires_at = 0
+
+
+device_cache = KioskDeviceCache(
+    ttl=getattr(settings, 'KIOSK_DEVICE_CACHE_TTL', 60),
+)
@@ -0,0 +1,191 @@
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from rightOnTime.sparse_fields import select_values, sparse_fields
+from .filters import ATTENDANCE_FIELDS, filter_attendance
+from .models import Attendance
+
+EXPORT_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+PAYROLL_GROUPS = ('attendance', 'employee')
+
+
+def _chunk_size():
+    return getattr(settings, 'ATTENDANCE_EXPORT_CHUNK_SIZE', 2000)
+
+
+def _encoded_rows(queryset, chunk_size):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield encoder.encode(row)
+
+
+def _ndjson(rows, chunk_size):
+    buffer = []
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            yield '\n'.join(buffer) + '\n'
+            buffer = []
+    if buffer:
+        yield '\n'.join(buffer) + '\n'
+
+
+def _json_array(rows, chunk_size):
+    yield '['
+    separator = ''
+    buffer = []
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= chunk_size:
+            yield separator + ','.join(buffer)
+            separator = ','
+            buffer = []
+    if buffer:
+        yield separator + ','.join(buffer)
+    yield ']\n'
+
+
+def stream_attendance(params, export_format):
+    """
+    Stream the filtered attendance table as a JSON array or NDJSON.
+    Rows are fetched `chunk_size` at a time (a server-side cursor on
+    Postgres) and written as they arrive, so worker memory stays flat.
+    """
+    chunk_size = _chunk_size()
+    fields = sparse_fields(params, ATTENDANCE_FIELDS)
+    queryset = filter_attendance(select_values(Attendance.objects, fields), params).order_by('date', 'id')
+    rows = _encoded_rows(queryset, chunk_size)
+    body = _ndjson(rows, chunk_size) if export_format == 'ndjson' else _json_array(rows, chunk_size)
+
+    response = StreamingHttpResponse(body, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="attendance.{export_format}"'
+    return response
+
+
+PAYROLL_ROW_FIELDS = (
+    'id_attendance', 'date', 'check_in_time', 'check_out_time', 'status',
+    'employee__id_employee', 'employee__document_id', 'employee__name', 'employee__lastname',
+)
+
+PAYROLL_ROW_HEADER = (
+    'id_attendance', 'date', 'id_employee', 'document_id', 'name', 'lastname',
+    'check_in_time', 'check_out_time', 'status', 'worked_minutes', 'worked_hours',
+)
+
+PAYROLL_EMPLOYEE_HEADER = (
+    'id_employee', 'document_id', 'name', 'lastname', 'period_start', 'period_end',
+    'days_present', 'days_missing_checkout', 'worked_minutes', 'worked_hours',
+)
+
+
+class _Echo:
+    """File-like object whose write() hands the CSV line back to the generator."""
+
+    def write(self, value):
+        return value
+
+
+# Leading characters a spreadsheet would read as the start of a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _text(value):
+    """Free-text cell, quoted with ' so Excel or Sheets never evaluate it."""
+    return f"'{value}" if value.startswith(FORMULA_PREFIXES) else value
+
+
+def _hours(minutes):
+    return f'{minutes / 60:.2f}'
+
+
+def _attendance_rows(rows):
+    for row in rows:
+        minutes = Attendance.minutes_between(row['check_in_time'], row['check_out_time'])
+        yield (
+            row['id_attendance'], row['date'], _text(row['employee__id_employee']),
+            row['employee__document_id'], _text(row['employee__name']), _text(row['employee__lastname']),
+            row['check_in_time'], row['check_out_time'] or '', row['status'],
+            '' if minutes is None else minutes, '' if minutes is None else _hours(minutes),
+        )
+
+
+def _employee_rows(rows, date_from, date_to):
+    """Fold the (employee, date)-ordered rows into one line per employee, in constant memory."""
+    current = None
+    for row in rows:
+        if current is None or row['employee_id'] != current['employee_id']:
+            if current is not None:
+                yield _employee_line(current, date_from, date_to)
+            current = {
+                'employee_id': row['employee_id'],
+                'employee': row,
+                'first': row['date'],
+                'last': row['date'],
+                'days': 0,
+                'missing': 0,
+                'minutes': 0,
+            }
+        minutes = Attendance.minutes_between(row['check_in_time'], row['check_out_time'])
+        current['last'] = row['date']
+        current['days'] += 1
+        if minutes is None:
+            current['missing'] += 1
+        else:
+            current['minutes'] += minutes
+    if current is not None:
+        yield _employee_line(current, date_from, date_to)
+
+
+def _employee_line(summary, date_from, date_to):
+    employee = summary['employee']
+    return (
+        _text(employee['employee__id_employee']), employee['employee__document_id'],
+        _text(employee['employee__name']), _text(employee['employee__lastname']),
+        date_from or summary['first'], date_to or summary['last'],
+        summary['days'], summary['missing'], summary['minutes'], _hours(summary['minutes']),
+    )
+
+
+def stream_payroll_csv(params, group):
+    """
+    Stream payroll CSV, one line per attendance (group='attendance') or per
+    employee over the requested period (group='employee'). Employee columns
+    come from the same JOINed query, so there is no per-row lookup.
+    """
+    chunk_size = _chunk_size()
+    queryset = filter_attendance(Attendance.objects.all(), params)
+
+    if group == 'employee':
+        header = PAYROLL_EMPLOYEE_HEADER
+        queryset = queryset.order_by('employee_id', 'date')
+        values = queryset.values('employee_id', *PAYROLL_ROW_FIELDS).iterator(chunk_size=chunk_size)
+        lines = _employee_rows(values, params.get('date_from'), params.get('date_to'))
+    else:
+        header = PAYROLL_ROW_HEADER
+        queryset = queryset.order_by('date', 'id')
+        lines = _attendance_rows(queryset.values(*PAYROLL_ROW_FIELDS).iterator(chunk_size=chunk_size))
+
+    writer = csv.writer(_Echo())
+
+    def body():
+        yield writer.writerow(header)
+        buffer = []
+        for line in lines:
+            buffer.append(writer.writerow(line))
+            if len(buffer) >= chunk_size:
+                yield ''.join(buffer)
+                buffer = []
+        if buffer:
+            yield ''.join(buffer)
+
+    response = StreamingHttpResponse(body(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="payroll_{group}.csv"'
+    return response
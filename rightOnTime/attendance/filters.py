@@ -0,0 +1,28 @@
+from rightOnTime.query_params import date_param, int_param
+from .models import Attendance
+
+# Columns of the .values() listings/exports, selectable with ?fields= / ?exclude=
+ATTENDANCE_FIELDS = tuple(field.attname for field in Attendance._meta.concrete_fields)
+
+
+def filter_attendance(queryset, params):
+    """
+    Narrow an Attendance queryset with the listing/export query parameters:
+    date_from / date_to (inclusive, AAAA-MM-DD), employee (employee pk) and
+    status. Employee ranges are served by the unique (employee, date) index,
+    day/status reports by the (date, status) index.
+    """
+    date_from = date_param(params, 'date_from')
+    date_to = date_param(params, 'date_to')
+    employee = int_param(params, 'employee')
+    status = params.get('status')
+
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+    if employee is not None:
+        queryset = queryset.filter(employee_id=employee)
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
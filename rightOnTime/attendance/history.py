@@ -0,0 +1,48 @@
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+from .models import Attendance
+from .summary import late_after
+
+HISTORY_GROUPS = ('day', 'month')
+
+
+def monthly_totals(history):
+    """Per-month counters of an attendance queryset, grouped in the database."""
+    return (
+        history
+        .annotate(month=TruncMonth('date'))
+        .values('month')
+        .annotate(
+            days=Count('id'),
+            late=Count('id', filter=Q(check_in_time__gt=late_after())),
+            checked_out=Count('check_out_time'),
+        )
+    )
+
+
+def with_worked_minutes(months, history):
+    """
+    Add missing_check_out and minutes_worked to a page of monthly_totals().
+    Minutes need Attendance.minutes_between (overnight shifts), so they are
+    summed in Python from one query bounded by the page's months.
+    """
+    if not months:
+        return months
+
+    newest = max(row['month'] for row in months)
+    oldest = min(row['month'] for row in months)
+    minutes = dict.fromkeys((row['month'] for row in months), 0)
+    rows = history.filter(
+        date__gte=oldest,
+        date__lt=newest.replace(year=newest.year + newest.month // 12, month=newest.month % 12 + 1),
+        check_out_time__isnull=False,
+    ).order_by().values_list('date', 'check_in_time', 'check_out_time')
+
+    for day, check_in_time, check_out_time in rows:
+        minutes[day.replace(day=1)] += Attendance.minutes_between(check_in_time, check_out_time)
+
+    for row in months:
+        row['missing_check_out'] = row['days'] - row['checked_out']
+        row['minutes_worked'] = minutes[row['month']]
+    return months
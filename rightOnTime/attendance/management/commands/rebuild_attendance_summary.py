@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_date
+
+from attendance.models import Attendance, DailyAttendanceSummary
+from attendance.summary import rebuild_days
+from employees.models import Employee
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily attendance summary table from the attendance records.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', help='First day to rebuild (AAAA-MM-DD), defaults to the oldest record')
+        parser.add_argument('--date-to', help='Last day to rebuild (AAAA-MM-DD), defaults to the newest record')
+
+    def handle(self, *args, **options):
+        bounds = Attendance.objects.aggregate(first=Min('date'), last=Max('date'))
+        first = self._date(options['date_from']) or bounds['first']
+        last = self._date(options['date_to']) or bounds['last']
+
+        if first is None or last is None:
+            deleted, _ = DailyAttendanceSummary.objects.all().delete()
+            self.stdout.write(f'No attendance records; removed {deleted} summary rows.')
+            return
+
+        if options['date_from'] is None and options['date_to'] is None:
+            # Full rebuild: also drop rows for days that no longer have records
+            DailyAttendanceSummary.objects.exclude(date__range=(first, last)).delete()
+
+        # Records written before Attendance.role existed are counted in the
+        # employee's current role
+        current_role = Employee.objects.filter(pk=OuterRef('employee_id')).values('role')[:1]
+        Attendance.objects.filter(date__range=(first, last), role='').update(
+            role=Coalesce(Subquery(current_role), Value(''))
+        )
+
+        days = 0
+        rows = 0
+        day = first
+        while day <= last:
+            # One day per transaction keeps locks short while kiosks keep writing
+            rows += rebuild_days([day])
+            days += 1
+            day += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} summary rows across {days} days.'))
+
+    def _date(self, value):
+        if value is None:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise CommandError(f'Invalid date: {value}')
+        return parsed
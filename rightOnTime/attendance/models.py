@@ -1,8 +1,62 @@
+import secrets
+
 from django.db import models
 from django.utils import timezone
 from employees.models import Employee
 
-# Create your models here.
+
+def new_device_secret():
+    return secrets.token_hex(32)
+
+
+class KioskDevice(models.Model):
+    """
+    Kiosco autorizado a marcar entradas y salidas. Firma cada petición con
+    HMAC-SHA256 usando `secret` (ver attendance.authentication).
+    """
+    device_id = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name='ID Dispositivo'
+    )
+
+    name = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        verbose_name='Nombre'
+    )
+
+    # Clave compartida con el kiosco; no se puede derivar de la firma
+    secret = models.CharField(
+        max_length=64,
+        default=new_device_secret,
+        verbose_name='Clave secreta'
+    )
+
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name='Activo'
+    )
+
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Fecha de creación'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de actualización'
+    )
+
+    def __str__(self):
+        return f'Kiosco {self.device_id}'
+
+    class Meta:
+        verbose_name = 'Kiosco'
+        verbose_name_plural = 'Kioscos'
+
+
 class Attendance(models.Model):
     id_attendance = models.CharField(
         max_length=50,
@@ -12,8 +66,11 @@ class Attendance(models.Model):
         verbose_name='ID Asistencia'
     )
 
+    # Por defecto la fecha de hoy; las marcaciones diferidas de los kioscos
+    # (carga por lotes) guardan la fecha en que realmente ocurrieron
     date = models.DateField(
-        auto_now_add=True,
+        default=timezone.localdate,
+        editable=False,
         blank=False,
         null=False,
         verbose_name='Fecha'
@@ -31,6 +88,15 @@ class Attendance(models.Model):
         verbose_name='Hora de salida'
     )
 
+    # Salida que reemplazó la última marcación de salida; el UPDATE de la
+    # salida la devuelve para ajustar el resumen sin leer la fila antes
+    previous_check_out_time = models.TimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name='Hora de salida anterior'
+    )
+
     status = models.CharField(
         default='Present',
         max_length=20,
@@ -45,6 +111,26 @@ class Attendance(models.Model):
         verbose_name='Empleado'
     )
 
+    # Rol del empleado al registrar la entrada: el resumen diario cuenta la
+    # salida en el mismo rol aunque el empleado cambie de rol en el día
+    role = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Rol al registrar la entrada'
+    )
+
+    # Kiosco que registró la entrada (vacío para marcaciones sin firma)
+    device = models.ForeignKey(
+        KioskDevice,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='attendances',
+        verbose_name='Dispositivo'
+    )
+
     created_at = models.DateTimeField(
         default=timezone.now,
         verbose_name='Fecha de creación'
@@ -57,7 +143,99 @@ class Attendance(models.Model):
 
     def __str__(self):
         return f'Asistencia {self.id_attendance} - Empleado {self.employee.id_employee}'
+
+    @staticmethod
+    def minutes_between(check_in_time, check_out_time):
+        """
+        Minutos trabajados entre la entrada y la salida (None sin salida).
+        Una salida anterior a la entrada se toma como turno que cruza la medianoche.
+        """
+        if check_in_time is None or check_out_time is None:
+            return None
+        start = check_in_time.hour * 60 + check_in_time.minute + check_in_time.second / 60
+        end = check_out_time.hour * 60 + check_out_time.minute + check_out_time.second / 60
+        if end < start:
+            end += 24 * 60
+        return int(end - start)
+
+    @property
+    def worked_minutes(self):
+        return self.minutes_between(self.check_in_time, self.check_out_time)
     
     class Meta:
         verbose_name = 'Asistencia'
-        verbose_name_plural = 'Asistencias'
\ No newline at end of file
+        verbose_name_plural = 'Asistencias'
+        # El índice (employee, date) lo crea la restricción única de abajo
+        indexes = [
+            # Orden estable para la paginación por cursor de /attendance/all/
+            models.Index(fields=['date', 'id'], name='attendance_date_id_idx'),
+            # Reportes por día y estado (?date_from=&date_to=&status=)
+            models.Index(fields=['date', 'status'], name='attendance_date_status_idx'),
+        ]
+        constraints = [
+            # Un empleado solo puede registrar una asistencia por día
+            models.UniqueConstraint(
+                fields=['employee', 'date'],
+                name='unique_attendance_per_employee_day'
+            ),
+        ]
+
+
+class DailyAttendanceSummary(models.Model):
+    """
+    Contadores por día y rol, mantenidos en la misma transacción que cada
+    entrada/salida, para que los tableros lean una fila en vez de recorrer
+    Attendance. Se puede reconstruir con `manage.py rebuild_attendance_summary`.
+    """
+    date = models.DateField(
+        verbose_name='Fecha'
+    )
+
+    role = models.CharField(
+        max_length=50,
+        blank=True,
+        default='',
+        verbose_name='Rol'
+    )
+
+    checked_in = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Entradas registradas'
+    )
+
+    late = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Entradas tarde'
+    )
+
+    checked_out = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Salidas registradas'
+    )
+
+    minutes_worked = models.BigIntegerField(
+        default=0,
+        verbose_name='Minutos trabajados'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de actualización'
+    )
+
+    @property
+    def missing_check_out(self):
+        return self.checked_in - self.checked_out
+
+    def __str__(self):
+        return f'Resumen {self.date} - {self.role or "Sin rol"}'
+
+    class Meta:
+        verbose_name = 'Resumen diario de asistencia'
+        verbose_name_plural = 'Resúmenes diarios de asistencia'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'role'],
+                name='unique_attendance_summary_per_day_role'
+            ),
+        ]
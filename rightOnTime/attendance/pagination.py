@@ -0,0 +1,27 @@
+from django.conf import settings
+
+from rightOnTime.pagination import KeysetPagination
+
+
+class AttendancePagination(KeysetPagination):
+    """Keyset pagination for attendance listings, served by the (date, id) index."""
+    ordering = ('date', 'id')
+    page_size = getattr(settings, 'ATTENDANCE_PAGE_SIZE', 100)
+    max_page_size = getattr(settings, 'ATTENDANCE_MAX_PAGE_SIZE', 1000)
+
+
+class EmployeeHistoryPagination(KeysetPagination):
+    """
+    One employee's attendance, newest first. (employee, date) is unique, so
+    the date alone is the key and each page is a backward scan of that index.
+    """
+    ordering = ('-date',)
+    page_size = getattr(settings, 'ATTENDANCE_PAGE_SIZE', 100)
+    max_page_size = getattr(settings, 'ATTENDANCE_MAX_PAGE_SIZE', 1000)
+
+
+class EmployeeHistoryMonthPagination(KeysetPagination):
+    """Month totals of one employee's attendance, newest month first."""
+    ordering = ('-month',)
+    page_size = 12
+    max_page_size = 120
@@ -0,0 +1,124 @@
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from rightOnTime.response_cache import bump
+from . import summary
+from .models import Attendance
+
+
+def record_check_in(employee, device=None):
+    """
+    Insert today's attendance for the employee and count it in the daily summary,
+    tagged with the kiosk `device` (a CachedDevice) that sent it, if any.
+    Returns False when the employee already has one (409).
+    """
+    now = datetime.now()
+
+    # Single INSERT: the (employee, date) unique constraint rejects duplicates,
+    # even when two swipes for the same employee arrive concurrently. The id
+    # carries the employee, as in batch, so two kiosks swiping at the same
+    # instant do not collide on the primary key.
+    try:
+        with transaction.atomic():
+            Attendance.objects.create(
+                id_attendance=f"A-{now.timestamp()}-{employee.pk}",
+                employee_id=employee.pk,
+                device_id=device.pk if device else None,
+                role=employee.role or '',
+                date=now.date(),
+                check_in_time=now.time()
+            )
+            summary.record_check_in(now.date(), employee.role, now.time())
+    except IntegrityError:
+        # Only today's existing row is a 409; any other violation is a real error
+        if not Attendance.objects.filter(employee_id=employee.pk, date=now.date()).exists():
+            raise
+        return False
+    return True
+
+
+def _update_check_out(employee_id, day, check_out_time, updated_at):
+    """
+    Set the check-out with a single UPDATE ... RETURNING. The statement keeps
+    the check-out it replaces in previous_check_out_time and returns it with
+    the check-in time and the role counted at check-in, so the summary needs
+    no read beforehand. Returns those three values, or None without a row.
+    """
+    opts = Attendance._meta
+    quote = connection.ops.quote_name
+    fields = {
+        name: opts.get_field(name)
+        for name in ('employee', 'date', 'check_in_time', 'check_out_time',
+                     'previous_check_out_time', 'role', 'updated_at')
+    }
+    column = {name: quote(field.column) for name, field in fields.items()}
+    returned = ('check_in_time', 'previous_check_out_time', 'role')
+
+    sql = (
+        f"UPDATE {quote(opts.db_table)} "
+        f"SET {column['previous_check_out_time']} = {column['check_out_time']}, "
+        f"{column['check_out_time']} = %s, {column['updated_at']} = %s "
+        f"WHERE {column['employee']} = %s AND {column['date']} = %s "
+        f"RETURNING {', '.join(column[name] for name in returned)}"
+    )
+    params = [
+        fields['check_out_time'].get_db_prep_value(check_out_time, connection),
+        fields['updated_at'].get_db_prep_value(updated_at, connection),
+        employee_id,
+        fields['date'].get_db_prep_value(day, connection),
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return tuple(fields[name].to_python(value) for name, value in zip(returned, row))
+
+
+def _lock_and_update_check_out(employee_id, day, check_out_time, updated_at):
+    """_update_check_out() for backends without UPDATE ... RETURNING."""
+    today = Attendance.objects.filter(employee_id=employee_id, date=day)
+    previous = today.select_for_update().values_list('check_in_time', 'check_out_time', 'role').first()
+    if previous is None:
+        return None
+    today.update(
+        previous_check_out_time=previous[1],
+        check_out_time=check_out_time,
+        updated_at=updated_at
+    )
+    return previous
+
+
+def _can_return_from_update():
+    # PostgreSQL and SQLite >= 3.35; MariaDB only supports RETURNING on INSERT
+    return connection.vendor in ('postgresql', 'sqlite') and connection.features.can_return_columns_from_insert
+
+
+def record_check_out(employee):
+    """
+    Set today's check-out time for the employee and update the daily summary.
+    Returns False when there is no check-in today (409).
+    """
+    now = datetime.now()
+    update = _update_check_out if _can_return_from_update() else _lock_and_update_check_out
+
+    with transaction.atomic():
+        # One UPDATE touching only the check-out columns; concurrent swipes
+        # queue on its row lock and each sees the check-out it replaces
+        previous = update(employee.pk, now.date(), now.time(), timezone.now())
+        if previous is None:
+            return False
+        check_in_time, previous_check_out, role = previous
+        bump('attendance')
+        # Counted in the role the check-in was counted in, not the current one
+        summary.record_check_out(now.date(), role, check_in_time, previous_check_out, now.time())
+    return True
+
+
+# Django only offers transactions to sync code, so the async views run the
+# same transactional write in a worker thread.
+arecord_check_in = sync_to_async(record_check_in)
+arecord_check_out = sync_to_async(record_check_out)
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rightOnTime.response_cache import bump
+from .devices import device_cache
+from .models import Attendance, KioskDevice
+
+
+# No post_delete receiver: it would turn every bulk/cascade delete of
+# attendance into a row-by-row delete. Deleting code calls bump() itself.
+@receiver(post_save, sender=Attendance)
+def invalidate_attendance_responses(sender, instance, **kwargs):
+    """Retire cached attendance listings; update()/bulk writes call bump() themselves."""
+    bump('attendance')
+
+
+@receiver(post_save, sender=KioskDevice)
+@receiver(post_delete, sender=KioskDevice)
+def reload_kiosk_devices(sender, instance, **kwargs):
+    """New, revoked and re-keyed devices take effect on the next swipe in this worker."""
+    device_cache.clear()
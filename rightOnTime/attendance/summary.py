@@ -0,0 +1,143 @@
+from collections import defaultdict
+from datetime import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Attendance, DailyAttendanceSummary
+
+COUNTERS = ('checked_in', 'late', 'checked_out', 'minutes_worked')
+# How record_changes() and the recount see an attendance row
+ROW_FIELDS = ('date', 'role', 'check_in_time', 'check_out_time')
+
+
+def late_after():
+    """Check-ins after this time count as late (ATTENDANCE_LATE_AFTER, default 08:00)."""
+    return getattr(settings, 'ATTENDANCE_LATE_AFTER', time(8, 0))
+
+
+def bump(day, role, **deltas):
+    """
+    Add `deltas` to the (day, role) counters with a single UPDATE, creating
+    the row on the first write of the day. Must run inside the transaction
+    that wrote the attendance row.
+    """
+    role = role or ''
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    rows = DailyAttendanceSummary.objects.filter(date=day, role=role)
+    increments = {name: F(name) + value for name, value in deltas.items()}
+    if rows.update(**increments):
+        return
+
+    try:
+        with transaction.atomic():
+            # A missing row has nothing to subtract from
+            DailyAttendanceSummary.objects.create(
+                date=day, role=role, **{name: max(value, 0) for name, value in deltas.items()}
+            )
+    except IntegrityError:
+        # Another swipe created today's row first
+        rows.update(**increments)
+
+
+def record_check_in(day, role, check_in_time):
+    bump(day, role, checked_in=1, late=int(check_in_time > late_after()))
+
+
+def record_check_out(day, role, check_in_time, previous_check_out, check_out_time):
+    """Count the first check-out of the day; later ones only adjust the minutes."""
+    previous = Attendance.minutes_between(check_in_time, previous_check_out) or 0
+    current = Attendance.minutes_between(check_in_time, check_out_time) or 0
+    bump(
+        day,
+        role,
+        checked_out=int(previous_check_out is None),
+        minutes_worked=current - previous,
+    )
+
+
+def _zero():
+    return dict.fromkeys(COUNTERS, 0)
+
+
+def _count(rows):
+    """Counters per (day, role) of attendance rows given as ROW_FIELDS tuples."""
+    threshold = late_after()
+    counters = defaultdict(_zero)
+    for day, role, check_in_time, check_out_time in rows:
+        summary = counters[(day, role or '')]
+        summary['checked_in'] += 1
+        summary['late'] += int(check_in_time > threshold)
+        if check_out_time is not None:
+            summary['checked_out'] += 1
+            summary['minutes_worked'] += Attendance.minutes_between(check_in_time, check_out_time)
+    return counters
+
+
+def record_changes(removed=(), added=()):
+    """
+    Move the summary from attendance rows as they were (`removed`) to how
+    they are now (`added`), both as ROW_FIELDS tuples, with one F() UPDATE
+    per affected (day, role). Used by batch, admin and purge writes; must
+    run inside the transaction that changed the rows, with the old values
+    read under select_for_update.
+    """
+    deltas = defaultdict(_zero)
+    for sign, rows in ((1, added), (-1, removed)):
+        for key, values in _count(rows).items():
+            for name, value in values.items():
+                deltas[key][name] += sign * value
+
+    # Fixed order, so two writers touching the same days cannot deadlock
+    for day, role in sorted(deltas):
+        values = deltas[(day, role)]
+        bump(day, role, **values)
+        if any(value < 0 for value in values.values()):
+            # Drop a row left empty, as a rebuild would
+            DailyAttendanceSummary.objects.filter(date=day, role=role, **_zero()).delete()
+
+
+def rebuild_days(days):
+    """
+    Recompute the summary rows of the given days from Attendance, in place.
+
+    The days' summary rows are locked before the recount, so a swipe that
+    commits meanwhile either is counted or waits and applies its F() delta
+    on top of the rebuilt value; none is overwritten. A swipe can create a
+    row for a role the first count did not see, so count and lock repeat
+    until every counted row is locked.
+    """
+    days = set(days)
+    if not days:
+        return 0
+
+    summaries = DailyAttendanceSummary.objects.filter(date__in=days)
+    attendance = Attendance.objects.filter(date__in=days).values_list(*ROW_FIELDS)
+    with transaction.atomic():
+        locked = None
+        counters = _count(attendance.iterator(chunk_size=2000))
+        while locked is None or counters.keys() - locked.keys():
+            missing = counters.keys() - (locked or {}).keys()
+            DailyAttendanceSummary.objects.bulk_create(
+                [DailyAttendanceSummary(date=day, role=role) for day, role in missing],
+                ignore_conflicts=True,
+            )
+            locked = {
+                (row.date, row.role): row
+                for row in summaries.select_for_update().order_by('date', 'role')
+            }
+            counters = _count(attendance.iterator(chunk_size=2000))
+
+        now = timezone.now()
+        for key, row in locked.items():
+            for name, value in counters.get(key, _zero()).items():
+                setattr(row, name, value)
+            row.updated_at = now
+        DailyAttendanceSummary.objects.bulk_update(locked.values(), [*COUNTERS, 'updated_at'], batch_size=500)
+        summaries.filter(**_zero()).delete()
+    return len(counters)
@@ -1,10 +1,13 @@
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.utils import timezone
 from datetime import datetime
 from .models import Attendance
 from employees.models import Employee
+from employees.cache import employee_cache
 from .serializers import AttendanceSerializer
 
 
@@ -81,6 +84,52 @@ class CheckInViewTest(APITestCase):
         response = self.client.post(self.url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
         self.assertIn('error', response.data)
+        self.assertEqual(Attendance.objects.filter(employee=self.employee).count(), 1)
+
+    def test_simultaneous_check_ins_do_not_collide(self):
+        """Test two employees swiping at the same instant both get in"""
+        from datetime import datetime
+        from unittest import mock
+        other = Employee.objects.create(
+            id_employee="EMP003",
+            document_id=1235,
+            name="Jim",
+            lastname="Smith",
+            phone_number=3001234569,
+        )
+        now = datetime.now()
+        with mock.patch('attendance.services.datetime') as clock:
+            clock.now.return_value = now
+            for document_id in (1234, 1235):
+                response = self.client.post(self.url, {'document_id': document_id}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(Attendance.objects.filter(employee=other).exists())
+
+    def test_check_in_skips_existence_query(self):
+        """Test check-in relies on the unique constraint instead of a pre-check"""
+        from .models import DailyAttendanceSummary
+        data = {'document_id': 1234}
+        employee_cache.get(1234)
+        DailyAttendanceSummary.objects.create(date=timezone.localdate(), role='Employee')
+        # INSERT + summary counter UPDATE, in one transaction (a savepoint here)
+        with self.assertNumQueries(4):
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_unique_attendance_per_day_constraint(self):
+        """Test the database rejects a second attendance on the same day"""
+        from django.db import IntegrityError, transaction
+        Attendance.objects.create(
+            id_attendance="A-first",
+            employee=self.employee,
+            check_in_time=timezone.now().time()
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Attendance.objects.create(
+                id_attendance="A-second",
+                employee=self.employee,
+                check_in_time=timezone.now().time()
+            )
 
 
 class CheckOutViewTest(APITestCase):
@@ -117,6 +166,49 @@ class CheckOutViewTest(APITestCase):
         attendance = Attendance.objects.get(employee=self.employee)
         self.assertIsNotNone(attendance.check_out_time)
     
+    def test_check_out_single_update(self):
+        """Test check-out is a single UPDATE that keeps the other columns"""
+        from .models import DailyAttendanceSummary
+        DailyAttendanceSummary.objects.create(date=timezone.localdate(), role='Employee', checked_in=1)
+        attendance = Attendance.objects.create(
+            id_attendance="A-update",
+            employee=self.employee,
+            role='Employee',
+            check_in_time=timezone.now().time(),
+            status="Late"
+        )
+        data = {'document_id': 5678}
+        # Warm the document_id cache so only the transaction remains: the
+        # attendance UPDATE ... RETURNING and the summary UPDATE (in a savepoint)
+        employee_cache.get(5678)
+        with self.assertNumQueries(4), CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statements = [q['sql'] for q in queries if 'attendance_attendance' in q['sql']]
+        self.assertEqual(len(statements), 1)
+        self.assertTrue(statements[0].startswith('UPDATE'))
+        attendance.refresh_from_db()
+        self.assertIsNotNone(attendance.check_out_time)
+        self.assertEqual(attendance.status, "Late")
+        summary = DailyAttendanceSummary.objects.get(date=timezone.localdate(), role='Employee')
+        self.assertEqual(summary.missing_check_out, 0)
+
+    def test_check_out_ignores_previous_days(self):
+        """Test check-out only matches today's attendance"""
+        from datetime import date, timedelta
+        attendance = Attendance.objects.create(
+            id_attendance="A-yesterday",
+            employee=self.employee,
+            check_in_time=timezone.now().time()
+        )
+        attendance.date = date.today() - timedelta(days=1)
+        attendance.save()
+        data = {'document_id': 5678}
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        attendance.refresh_from_db()
+        self.assertIsNone(attendance.check_out_time)
+
     def test_check_out_missing_document_id(self):
         """Test check-out without document_id"""
         response = self.client.post(self.url, {}, format='json')
@@ -179,3 +271,763 @@ class ListAllAttendanceViewTest(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, list)
+
+    def _create_history(self, days):
+        from datetime import date, timedelta
+        for offset in range(days):
+            attendance = Attendance.objects.create(
+                id_attendance=f"A-H{offset}",
+                employee=self.employee,
+                check_in_time=timezone.now().time()
+            )
+            attendance.date = date(2024, 1, 1) + timedelta(days=offset)
+            attendance.save()
+
+    def test_list_attendance_cursor_pagination(self):
+        """Test following the next cursor walks every row once, in (date, id) order"""
+        self._create_history(5)
+        seen = []
+        url = f'{self.url}?page_size=2'
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data), 2)
+            seen.extend(row['id_attendance'] for row in response.data)
+            url = response.headers.get('Link', '').partition('<')[2].partition('>')[0]
+        self.assertEqual(seen, [f"A-H{offset}" for offset in range(5)])
+
+    def test_list_attendance_last_page_has_no_cursor(self):
+        """Test the last page does not advertise a next cursor"""
+        self._create_history(2)
+        response = self.client.get(self.url, {'page_size': 5})
+        self.assertEqual(len(response.data), 2)
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_list_attendance_filters(self):
+        """Test the listing filters by date range, employee and status"""
+        from datetime import date
+        self._create_history(5)
+        Attendance.objects.filter(id_attendance="A-H3").update(status="Late")
+        other = Employee.objects.create(
+            id_employee="EMP005",
+            document_id=1112,
+            name="Other",
+            lastname="Employee",
+            phone_number=3001234572,
+            contract_date=date.today()
+        )
+        Attendance.objects.create(
+            id_attendance="A-other",
+            employee=other,
+            check_in_time=timezone.now().time()
+        )
+
+        response = self.client.get(self.url, {'date_from': '2024-01-02', 'date_to': '2024-01-04'})
+        self.assertEqual([row['id_attendance'] for row in response.data], ["A-H1", "A-H2", "A-H3"])
+
+        response = self.client.get(self.url, {'employee': other.pk})
+        self.assertEqual([row['id_attendance'] for row in response.data], ["A-other"])
+
+        response = self.client.get(self.url, {'status': 'Late'})
+        self.assertEqual([row['id_attendance'] for row in response.data], ["A-H3"])
+
+    def test_list_attendance_invalid_filter(self):
+        """Test malformed filter values return 400"""
+        response = self.client.get(self.url, {'employee': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_attendance_invalid_cursor(self):
+        """Test a tampered cursor is rejected"""
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_attendance_cursor_with_wrong_types(self):
+        """Test a well-formed cursor holding values of the wrong type is a 404"""
+        import base64
+        import json
+        for position in (["x", 1], [1, "y"], [None, None], ["2024-01-01", [1]]):
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+            response = self.client.get(self.url, {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, position)
+
+    def test_list_attendance_sparse_fields(self):
+        """Test ?fields= selects only those columns while the cursor still works"""
+        self._create_history(3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'id_attendance,status', 'page_size': 2})
+        self.assertEqual(
+            response.data,
+            [{'id_attendance': 'A-H0', 'status': 'Present'}, {'id_attendance': 'A-H1', 'status': 'Present'}]
+        )
+        self.assertNotIn('created_at', queries[0]['sql'])
+
+        response = self.client.get(self.url, {'fields': 'id_attendance', 'cursor': response['X-Next-Cursor']})
+        self.assertEqual(response.data, [{'id_attendance': 'A-H2'}])
+
+    def test_async_list_attendance_sparse_fields(self):
+        """Test the async listing applies ?fields= / ?exclude= the same way"""
+        from django.contrib.auth import get_user_model
+        from rest_framework_simplejwt.tokens import RefreshToken
+        self._create_history(2)
+        token = RefreshToken.for_user(get_user_model().objects.get(username="alice")).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get('/attendance/async/all/', {'fields': 'id_attendance,date'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([sorted(row) for row in response.json()], [['date', 'id_attendance']] * 2)
+
+        response = self.client.get('/attendance/async/all/', {'exclude': 'salary'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_attendance_response_cache(self):
+        """Test repeat pages come from the response cache until an attendance write"""
+        self._create_history(2)
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+        Attendance.objects.create(
+            id_attendance="A-new",
+            employee=self.employee,
+            check_in_time=timezone.now().time()
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data), 3)
+
+    def test_list_attendance_conditional_get(self):
+        """Test sync and async listings answer If-None-Match with 304"""
+        from django.contrib.auth import get_user_model
+        from django.test import override_settings
+        from rest_framework_simplejwt.tokens import RefreshToken
+        self._create_history(2)
+        # The async view authenticates the JWT itself
+        token = RefreshToken.for_user(get_user_model().objects.get(username="alice")).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        for url in (self.url, '/attendance/async/all/'):
+            response = self.client.get(url, {'date_from': '2024-01-01'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response['ETag']
+            response = self.client.get(url, {'date_from': '2024-01-01'}, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            # Versions on a per-process cache would go stale on the other workers
+            with override_settings(SINGLE_PROCESS=False):
+                stale = self.client.get(url, {'date_from': '2024-01-01'}, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(stale.status_code, status.HTTP_200_OK)
+            self.assertNotIn('ETag', stale)
+
+    def test_list_attendance_exclude_fields(self):
+        """Test ?exclude= drops columns and unknown names are a 400"""
+        self._create_history(1)
+        response = self.client.get(self.url, {'exclude': 'created_at,updated_at'})
+        self.assertNotIn('created_at', response.data[0])
+        self.assertIn('check_in_time', response.data[0])
+
+        response = self.client.get(self.url, {'fields': 'id_attendance,salary'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+
+class BatchEventsViewTest(APITestCase):
+    """Test cases for batch_events view"""
+
+    def setUp(self):
+        from datetime import date
+        self.client = APIClient()
+        self.url = '/attendance/batch/'
+        self.employee = Employee.objects.create(
+            id_employee="EMP010",
+            document_id=2020,
+            name="Kiosk",
+            lastname="Replay",
+            phone_number=3001234580,
+            contract_date=date.today()
+        )
+        self.other = Employee.objects.create(
+            id_employee="EMP011",
+            document_id=2021,
+            name="Second",
+            lastname="Worker",
+            phone_number=3001234581,
+            contract_date=date.today()
+        )
+
+    def test_batch_replays_backlog(self):
+        """Test a mixed backlog is applied with a handful of queries"""
+        events = [
+            {'document_id': 2020, 'kind': 'checkin', 'client_timestamp': '2024-03-04T08:01:00'},
+            {'document_id': 2021, 'kind': 'checkin', 'client_timestamp': '2024-03-04T08:02:00'},
+            {'document_id': 2020, 'kind': 'checkout', 'client_timestamp': '2024-03-04T17:00:00'},
+            {'document_id': 2020, 'kind': 'checkin', 'client_timestamp': '2024-03-05T08:00:00'},
+        ]
+        # Two IN lookups (the attendance one locks the rows), one bulk INSERT,
+        # then one summary UPDATE per (day, role); both days are new here, so
+        # each also creates its row in a savepoint
+        with self.assertNumQueries(13):
+            response = self.client.post(self.url, {'events': events}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in response.data['results']], [200, 200, 200, 200])
+
+        from datetime import date, time
+        first_day = Attendance.objects.get(employee=self.employee, date=date(2024, 3, 4))
+        self.assertEqual(first_day.check_in_time, time(8, 1))
+        self.assertEqual(first_day.check_out_time, time(17, 0))
+        self.assertEqual(Attendance.objects.filter(employee=self.employee).count(), 2)
+
+    def test_batch_checkout_of_existing_attendance(self):
+        """Test a batched check-out updates a row created before the batch"""
+        attendance = Attendance.objects.create(
+            id_attendance="A-batch",
+            employee=self.employee,
+            check_in_time=timezone.now().time()
+        )
+        events = [{
+            'document_id': 2020,
+            'kind': 'checkout',
+            'client_timestamp': f'{attendance.date.isoformat()}T18:30:00'
+        }]
+        response = self.client.post(self.url, {'events': events}, format='json')
+        self.assertEqual(response.data['results'][0]['status'], 200)
+        attendance.refresh_from_db()
+        self.assertIsNotNone(attendance.check_out_time)
+
+    def test_batch_reports_errors_per_event(self):
+        """Test each invalid event gets its own result"""
+        events = [
+            {'document_id': 2020, 'kind': 'checkin', 'client_timestamp': '2024-03-04T08:00:00'},
+            {'document_id': 2020, 'kind': 'checkin', 'client_timestamp': '2024-03-04T08:05:00'},
+            {'document_id': 9999, 'kind': 'checkin', 'client_timestamp': '2024-03-04T08:00:00'},
+            {'document_id': 2021, 'kind': 'checkout', 'client_timestamp': '2024-03-04T17:00:00'},
+            {'document_id': 2021, 'kind': 'lunch', 'client_timestamp': '2024-03-04T12:00:00'},
+            {'document_id': 2021, 'kind': 'checkin', 'client_timestamp': 'yesterday'},
+        ]
+        response = self.client.post(self.url, {'events': events}, format='json')
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], [200, 409, 404, 409, 400, 400])
+        self.assertEqual([r['index'] for r in results], list(range(6)))
+        self.assertEqual(Attendance.objects.count(), 1)
+
+    def test_batch_rejects_non_integer_document_ids(self):
+        """Test floats and booleans are not taken as document ids"""
+        events = [
+            {'document_id': value, 'kind': 'checkin', 'client_timestamp': '2024-03-04T08:00:00'}
+            for value in (2020.5, True, '2020abc', None)
+        ] + [{'document_id': '2020', 'kind': 'checkin', 'client_timestamp': '2024-03-04T08:00:00'}]
+        response = self.client.post(self.url, {'events': events}, format='json')
+        self.assertEqual([r['status'] for r in response.data['results']], [400, 400, 400, 400, 200])
+
+    def test_batch_repeated_conflict_is_reported_per_event(self):
+        """Test a second IntegrityError becomes a 409 per event instead of a 500"""
+        from unittest import mock
+        from django.db import IntegrityError
+        events = [{'document_id': 2020, 'kind': 'checkin', 'client_timestamp': '2024-03-04T08:00:00'}]
+        with mock.patch('attendance.batch._apply_events', side_effect=IntegrityError) as apply_events:
+            response = self.client.post(self.url, {'events': events}, format='json')
+        self.assertEqual(apply_events.call_count, 2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['status'], 409)
+
+    def test_batch_requires_events(self):
+        """Test the batch endpoint rejects an empty payload"""
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+
+
+class AsyncAttendanceViewsTest(APITestCase):
+    """Test cases for the native async check-in/check-out/list views"""
+
+    def setUp(self):
+        from datetime import date
+        self.client = APIClient()
+        self.employee = Employee.objects.create(
+            id_employee="EMP020",
+            document_id=3030,
+            name="Async",
+            lastname="Kiosk",
+            phone_number=3001234590,
+            contract_date=date.today()
+        )
+
+    def test_async_check_in_and_check_out(self):
+        """Test the async views keep the sync endpoints' contract"""
+        data = {'document_id': 3030}
+        response = self.client.post('/attendance/async/checkin/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['message'], 'Entrada registrada correctamente')
+
+        response = self.client.post('/attendance/async/checkin/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        response = self.client.post('/attendance/async/checkout/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(Attendance.objects.get(employee=self.employee).check_out_time)
+
+    def test_async_errors(self):
+        """Test the async views report missing/unknown employees"""
+        response = self.client.post('/attendance/async/checkin/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/attendance/async/checkout/', {'document_id': 9999}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post('/attendance/async/checkout/', {'document_id': 3030}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_async_list_requires_authentication(self):
+        """Test the async listing checks the JWT like the sync one"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from administrator.models import Administrator
+        response = self.client.get('/attendance/async/all/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        user = Administrator.objects.create_user(
+            username="async_admin",
+            email="async@test.com",
+            password="testpass123",
+            id_administrator="ADM-ASYNC",
+            phone_number=3001234591
+        )
+        Attendance.objects.create(
+            id_attendance="A-async",
+            employee=self.employee,
+            check_in_time=timezone.now().time()
+        )
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = self.client.get('/attendance/async/all/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+
+
+class ExportAttendanceViewTest(APITestCase):
+    """Test cases for export_attendance view"""
+
+    def setUp(self):
+        from datetime import date, timedelta
+        from administrator.models import Administrator
+        self.client = APIClient()
+        self.url = '/attendance/export/'
+        self.employee = Employee.objects.create(
+            id_employee="EMP030",
+            document_id=4040,
+            name="Payroll",
+            lastname="Export",
+            phone_number=3001234600,
+            contract_date=date.today()
+        )
+        self.other = Employee.objects.create(
+            id_employee="EMP031",
+            document_id=4041,
+            name="Other",
+            lastname="Export",
+            phone_number=3001234601,
+            contract_date=date.today()
+        )
+        for offset in range(3):
+            for employee in (self.employee, self.other):
+                attendance = Attendance.objects.create(
+                    id_attendance=f"A-E{employee.pk}-{offset}",
+                    employee=employee,
+                    check_in_time=timezone.now().time()
+                )
+                attendance.date = date(2024, 3, 1) + timedelta(days=offset)
+                attendance.save()
+        user = Administrator.objects.create_user(
+            username="payroll",
+            email="payroll@test.com",
+            password="testpass123",
+            id_administrator="ADM-PAY",
+            phone_number=3001234602
+        )
+        self.client.force_authenticate(user=user)
+
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_json_array(self):
+        """Test the default export is one JSON array"""
+        import json
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        rows = json.loads(self._content(response))
+        self.assertEqual(len(rows), 6)
+
+    def test_export_ndjson_with_filters(self):
+        """Test NDJSON export honours the date range and employee filters"""
+        import json
+        response = self.client.get(self.url, {
+            'output': 'ndjson',
+            'employee': self.employee.pk,
+            'date_from': '2024-03-02',
+            'date_to': '2024-03-03',
+        })
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual([row['date'] for row in rows], ['2024-03-02', '2024-03-03'])
+        self.assertTrue(all(row['employee_id'] == self.employee.pk for row in rows))
+
+    def test_export_sparse_fields(self):
+        """Test JSON exports honour ?fields="""
+        import json
+        response = self.client.get(self.url, {'output': 'ndjson', 'fields': 'date,employee_id'})
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(all(set(row) == {'date', 'employee_id'} for row in rows))
+
+    def test_export_chunks_are_joined_correctly(self):
+        """Test the JSON array stays valid across chunk boundaries"""
+        import json
+        with self.settings(ATTENDANCE_EXPORT_CHUNK_SIZE=4):
+            response = self.client.get(self.url)
+            self.assertEqual(len(json.loads(self._content(response))), 6)
+
+    def test_export_rejects_bad_parameters(self):
+        """Test unknown formats and malformed filters return 400"""
+        response = self.client.get(self.url, {'output': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'date_from': '03/01/2024'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_requires_authentication(self):
+        """Test the export is not public"""
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_payroll_csv_per_attendance(self):
+        """Test the payroll CSV joins employee columns and computes worked time"""
+        import csv
+        from datetime import time
+        Attendance.objects.filter(employee=self.employee).update(
+            check_in_time=time(8, 0), check_out_time=time(16, 30)
+        )
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'output': 'csv', 'employee': self.employee.pk})
+            rows = list(csv.DictReader(self._content(response).splitlines()))
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['name'], 'Payroll')
+        self.assertEqual(rows[0]['worked_minutes'], '510')
+        self.assertEqual(rows[0]['worked_hours'], '8.50')
+
+    def test_export_payroll_csv_per_employee(self):
+        """Test the payroll CSV can fold the period into one line per employee"""
+        import csv
+        from datetime import date, time
+        Attendance.objects.filter(employee=self.employee).update(
+            check_in_time=time(8, 0), check_out_time=time(12, 0)
+        )
+        Attendance.objects.filter(employee=self.employee, date=date(2024, 3, 3)).update(
+            check_out_time=None
+        )
+        response = self.client.get(self.url, {
+            'output': 'csv', 'group': 'employee', 'date_from': '2024-03-01', 'date_to': '2024-03-31'
+        })
+        rows = {row['id_employee']: row for row in csv.DictReader(self._content(response).splitlines())}
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows['EMP030']['days_present'], '3')
+        self.assertEqual(rows['EMP030']['days_missing_checkout'], '1')
+        self.assertEqual(rows['EMP030']['worked_minutes'], '480')
+        self.assertEqual(rows['EMP030']['period_end'], '2024-03-31')
+
+    def test_export_payroll_csv_escapes_formulas(self):
+        """Test names a spreadsheet would evaluate are written as plain text"""
+        import csv
+        Employee.objects.filter(pk=self.employee.pk).update(name='=HYPERLINK("http://x")', lastname='-1+2')
+        for group in ('attendance', 'employee'):
+            response = self.client.get(self.url, {'output': 'csv', 'group': group, 'employee': self.employee.pk})
+            row = next(csv.DictReader(self._content(response).splitlines()))
+            self.assertEqual(row['name'], '\'=HYPERLINK("http://x")')
+            self.assertEqual(row['lastname'], "'-1+2")
+            self.assertEqual(row['id_employee'], 'EMP030')
+
+    def test_export_payroll_csv_rejects_unknown_group(self):
+        """Test an unknown CSV grouping returns 400"""
+        response = self.client.get(self.url, {'output': 'csv', 'group': 'site'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class WorkedMinutesTest(TestCase):
+    """Test cases for Attendance.minutes_between"""
+
+    def test_minutes_between(self):
+        """Test worked minutes, missing check-outs and overnight shifts"""
+        from datetime import time
+        self.assertEqual(Attendance.minutes_between(time(8, 0), time(17, 15)), 555)
+        self.assertIsNone(Attendance.minutes_between(time(8, 0), None))
+        self.assertEqual(Attendance.minutes_between(time(22, 0), time(6, 0)), 480)
+
+
+class DailyAttendanceSummaryTest(APITestCase):
+    """Test cases for the incrementally maintained daily summary"""
+
+    def setUp(self):
+        from datetime import date
+        from administrator.models import Administrator
+        self.client = APIClient()
+        self.employee = Employee.objects.create(
+            id_employee="EMP040",
+            document_id=5050,
+            name="Summary",
+            lastname="Counter",
+            phone_number=3001234610,
+            role="Operario",
+            contract_date=date.today()
+        )
+        self.user = Administrator.objects.create_user(
+            username="dashboard",
+            email="dashboard@test.com",
+            password="testpass123",
+            id_administrator="ADM-DASH",
+            phone_number=3001234611,
+            is_staff=True,
+            is_superuser=True
+        )
+
+    def _summary(self, day=None):
+        from .models import DailyAttendanceSummary
+        return DailyAttendanceSummary.objects.get(date=day or timezone.localdate(), role="Operario")
+
+    def test_check_in_and_check_out_update_counters(self):
+        """Test the kiosk endpoints keep the day's counters in sync"""
+        self.client.post('/attendance/checkin/', {'document_id': 5050}, format='json')
+        summary = self._summary()
+        self.assertEqual(summary.checked_in, 1)
+        self.assertEqual(summary.missing_check_out, 1)
+
+        self.client.post('/attendance/checkout/', {'document_id': 5050}, format='json')
+        summary.refresh_from_db()
+        self.assertEqual(summary.checked_out, 1)
+        self.assertEqual(summary.missing_check_out, 0)
+
+        # A second check-out adjusts minutes but is not counted twice
+        self.client.post('/attendance/checkout/', {'document_id': 5050}, format='json')
+        summary.refresh_from_db()
+        self.assertEqual(summary.checked_out, 1)
+
+    def test_rejected_check_in_is_not_counted(self):
+        """Test a duplicate check-in rolls back with its INSERT"""
+        self.client.post('/attendance/checkin/', {'document_id': 5050}, format='json')
+        self.client.post('/attendance/checkin/', {'document_id': 5050}, format='json')
+        self.assertEqual(self._summary().checked_in, 1)
+
+    def test_check_out_counts_in_the_check_in_role(self):
+        """Test a role change between check-in and check-out keeps the summary balanced"""
+        from .models import DailyAttendanceSummary
+        self.client.post('/attendance/checkin/', {'document_id': 5050}, format='json')
+        Employee.objects.filter(pk=self.employee.pk).update(role="Supervisor")
+        employee_cache.clear()
+
+        self.client.post('/attendance/checkout/', {'document_id': 5050}, format='json')
+        summary = self._summary()
+        self.assertEqual(summary.checked_out, 1)
+        self.assertEqual(summary.missing_check_out, 0)
+        self.assertFalse(DailyAttendanceSummary.objects.filter(role="Supervisor").exists())
+
+    def test_rebuild_keeps_concurrent_rows(self):
+        """Test a rebuild writes counters in place and drops emptied rows"""
+        from datetime import date, time
+        from . import summary
+        from .models import DailyAttendanceSummary
+        day = date(2024, 5, 6)
+        Attendance.objects.create(
+            id_attendance="A-rebuild", employee=self.employee, role="Operario", check_in_time=time(7, 50)
+        )
+        Attendance.objects.filter(id_attendance="A-rebuild").update(date=day)
+        DailyAttendanceSummary.objects.create(date=day, role="Operario", checked_in=5)
+        DailyAttendanceSummary.objects.create(date=day, role="Vacío", checked_in=2)
+        row = self._summary(day)
+
+        self.assertEqual(summary.rebuild_days([day]), 1)
+        self.assertEqual(self._summary(day).pk, row.pk)
+        self.assertEqual(self._summary(day).checked_in, 1)
+        self.assertFalse(DailyAttendanceSummary.objects.filter(role="Vacío").exists())
+
+    def test_late_and_minutes(self):
+        """Test late check-ins and worked minutes are recorded"""
+        from datetime import date, time
+        from . import summary
+        day = date(2024, 5, 6)
+        with self.settings(ATTENDANCE_LATE_AFTER=time(8, 0)):
+            summary.record_check_in(day, "Operario", time(8, 15))
+            summary.record_check_out(day, "Operario", time(8, 15), None, time(16, 15))
+            summary.record_check_out(day, "Operario", time(8, 15), time(16, 15), time(17, 15))
+        row = self._summary(day)
+        self.assertEqual(row.late, 1)
+        self.assertEqual(row.checked_out, 1)
+        self.assertEqual(row.minutes_worked, 540)
+
+    def test_rebuild_command_matches_incremental_counters(self):
+        """Test the management command rebuilds the table from scratch"""
+        from django.core.management import call_command
+        from io import StringIO
+        from .models import DailyAttendanceSummary
+        self.client.post('/attendance/checkin/', {'document_id': 5050}, format='json')
+        self.client.post('/attendance/checkout/', {'document_id': 5050}, format='json')
+        incremental = self._summary()
+
+        DailyAttendanceSummary.objects.all().delete()
+        call_command('rebuild_attendance_summary', stdout=StringIO())
+        rebuilt = self._summary()
+        self.assertEqual(
+            (rebuilt.checked_in, rebuilt.late, rebuilt.checked_out, rebuilt.minutes_worked),
+            (incremental.checked_in, incremental.late, incremental.checked_out, incremental.minutes_worked)
+        )
+
+    def test_admin_edit_recounts_days(self):
+        """Test admin edits/deletes recount the affected days"""
+        from datetime import date, time
+        from django.contrib import admin
+        from django.test import RequestFactory
+        from .admin import AttendanceAdmin
+        from .models import DailyAttendanceSummary
+        self.client.post('/attendance/checkin/', {'document_id': 5050}, format='json')
+        attendance = Attendance.objects.get(employee=self.employee)
+        model_admin = AttendanceAdmin(Attendance, admin.site)
+        request = RequestFactory().post('/')
+        request.user = self.user
+
+        attendance.check_in_time = time(9, 0)
+        attendance.check_out_time = time(17, 0)
+        attendance.date = date(2024, 5, 6)
+        model_admin.save_model(request, attendance, None, True)
+        self.assertFalse(DailyAttendanceSummary.objects.filter(date=date.today()).exists())
+        self.assertEqual(self._summary(date(2024, 5, 6)).minutes_worked, 480)
+
+        model_admin.delete_model(request, attendance)
+        self.assertFalse(DailyAttendanceSummary.objects.exists())
+
+    def test_summary_endpoint(self):
+        """Test the dashboard reads counters from the summary table"""
+        self.client.post('/attendance/checkin/', {'document_id': 5050}, format='json')
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(1):
+            response = self.client.get('/attendance/summary/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['checked_in'], 1)
+        self.assertEqual(response.data['by_role'][0]['role'], 'Operario')
+
+        response = self.client.get('/attendance/summary/', {'date': 'today'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class KioskDeviceAuthenticationTest(APITestCase):
+    """Test cases for HMAC-signed kiosk swipes"""
+
+    def setUp(self):
+        import json
+        from datetime import date
+        from .models import KioskDevice
+        self.device = KioskDevice.objects.create(device_id="KIOSK-01", name="Entrada principal")
+        self.employee = Employee.objects.create(
+            id_employee="EMP-KIOSK",
+            document_id=7001,
+            name="Kiosk",
+            lastname="User",
+            phone_number=3001230001,
+            contract_date=date.today()
+        )
+        self.body = json.dumps({"document_id": 7001}).encode()
+
+    def signed(self, path, body=None, nonce="n-1", timestamp=None, secret=None):
+        import time
+        from .authentication import sign
+        body = self.body if body is None else body
+        timestamp = str(int(time.time())) if timestamp is None else str(timestamp)
+        signature = sign(secret or self.device.secret, timestamp, nonce, 'POST', path, body)
+        return self.client.generic(
+            'POST', path, body, content_type='application/json',
+            HTTP_X_KIOSK_DEVICE=self.device.device_id,
+            HTTP_X_KIOSK_TIMESTAMP=timestamp,
+            HTTP_X_KIOSK_NONCE=nonce,
+            HTTP_X_KIOSK_SIGNATURE=signature,
+        )
+
+    def test_signed_check_in_tags_the_device(self):
+        """Test a signed check-in is recorded with its kiosk"""
+        response = self.signed('/attendance/checkin/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Attendance.objects.get(employee=self.employee).device, self.device)
+
+    def test_device_table_is_read_once(self):
+        """Test only the first swipe loads the device table"""
+        self.signed('/attendance/checkout/')
+        with CaptureQueriesContext(connection) as queries:
+            self.signed('/attendance/checkout/', nonce="n-2")
+        self.assertFalse(any('attendance_kioskdevice' in query['sql'] for query in queries))
+
+    def test_replayed_request_is_rejected(self):
+        """Test the same signed request cannot be sent twice"""
+        self.assertEqual(self.signed('/attendance/checkin/').status_code, status.HTTP_200_OK)
+        response = self.signed('/attendance/checkin/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Kiosk-HMAC')
+
+    def test_bad_signature_is_rejected(self):
+        """Test a signature made with another key is rejected"""
+        response = self.signed('/attendance/checkin/', secret="otra-clave")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_stale_timestamp_is_rejected(self):
+        """Test a request signed outside the time window is rejected"""
+        import time
+        response = self.signed('/attendance/checkin/', timestamp=int(time.time()) - 3600)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoked_device_is_rejected(self):
+        """Test deactivating a device takes effect on the next swipe"""
+        self.signed('/attendance/checkout/')
+        self.device.is_active = False
+        self.device.save()
+        response = self.signed('/attendance/checkin/', nonce="n-2")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unsigned_swipes_allowed_by_default(self):
+        """Test kiosks without a key keep working until the setting is turned on"""
+        from django.conf import settings
+        from django.test import override_settings
+        with override_settings():
+            del settings.KIOSK_REQUIRE_DEVICE_AUTH
+            response = self.client.post('/attendance/checkin/', {"document_id": 7001}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(Attendance.objects.get(employee=self.employee).device)
+
+    def test_unsigned_swipes_rejected_when_required(self):
+        """Test KIOSK_REQUIRE_DEVICE_AUTH turns unsigned swipes away"""
+        from django.test import override_settings
+        with override_settings(KIOSK_REQUIRE_DEVICE_AUTH=True):
+            response = self.client.post('/attendance/checkin/', {"document_id": 7001}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            response = self.client.post('/attendance/async/checkin/', {"document_id": 7001}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(self.signed('/attendance/checkin/').status_code, status.HTTP_200_OK)
+
+    def test_signed_swipes_refused_without_shared_nonce_cache(self):
+        """Test several workers on a local-memory nonce cache refuse signatures instead of missing replays"""
+        from django.test import override_settings
+        with override_settings(SINGLE_PROCESS=False):
+            response = self.signed('/attendance/checkin/')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            response = self.signed('/attendance/async/checkin/', nonce="n-2")
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_signed_async_check_in(self):
+        """Test the async endpoint verifies the signature and tags the device"""
+        response = self.signed('/attendance/async/checkin/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Attendance.objects.get(employee=self.employee).device, self.device)
+
+    def test_signed_batch_tags_the_device(self):
+        """Test buffered check-ins replayed by a kiosk carry its device"""
+        import json
+        body = json.dumps({"events": [{
+            "document_id": 7001,
+            "client_timestamp": "2024-01-15T08:00:00",
+            "kind": "checkin"
+        }]}).encode()
+        response = self.signed('/attendance/batch/', body=body)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Attendance.objects.get(employee=self.employee).device, self.device)
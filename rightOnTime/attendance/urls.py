@@ -1,8 +1,17 @@
 from django.urls import path
-from .views import check_in, check_out, list_all_attendance
+from . import async_views
+from .views import check_in, check_out, batch_events, list_all_attendance, export_attendance, attendance_summary
 
 urlpatterns = [
     path('checkin/', check_in),
     path('checkout/', check_out),
+    path('batch/', batch_events),
     path('all/', list_all_attendance),
+    path('export/', export_attendance),
+    path('summary/', attendance_summary),
+
+    # Native async variants, for the ASGI serving profile
+    path('async/checkin/', async_views.check_in),
+    path('async/checkout/', async_views.check_out),
+    path('async/all/', async_views.list_all_attendance),
 ]
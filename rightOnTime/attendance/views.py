@@ -1,66 +1,163 @@
-from rest_framework.decorators import api_view, permission_classes
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from datetime import datetime
-from .models import Attendance
-from employees.models import Employee
+from .authentication import IsKioskDevice, KioskDeviceAuthentication
+from .models import Attendance, DailyAttendanceSummary
+from .batch import process_events
+from .export import EXPORT_FORMATS, PAYROLL_GROUPS, stream_attendance, stream_payroll_csv
+from .filters import ATTENDANCE_FIELDS, filter_attendance
+from .pagination import AttendancePagination
+from .services import record_check_in, record_check_out
+from employees.cache import employee_cache
+from rightOnTime.conditional import conditional
+from rightOnTime.response_cache import ResponseCache
+from rightOnTime.sparse_fields import select_values, sparse_fields, strip_values
+
+# Listing responses, retired by any attendance write
+attendance_list_cache = ResponseCache('attendance-list', ['attendance'])
 
 
 @api_view(['POST'])
-@permission_classes([AllowAny])
+@authentication_classes([KioskDeviceAuthentication])
+@permission_classes([IsKioskDevice])
 def check_in(request):
     document_id = request.data.get('document_id')
 
     if not document_id:
         return Response({"error": "document_id requerido"}, status=400)
 
-    try:
-        employee = Employee.objects.get(document_id=document_id)
-    except Employee.DoesNotExist:
-        return Response({"error": "Empleado no existe"}, status=404)
+    employee = employee_cache.get(document_id)
 
-    today = datetime.now().date()
+    if employee is None:
+        return Response({"error": "Empleado no existe"}, status=404)
 
-    if Attendance.objects.filter(employee=employee, date=today).exists():
+    if not record_check_in(employee, device=request.auth):
         return Response({"error": "Este empleado ya tiene asistencia hoy"}, status=409)
 
-    Attendance.objects.create(
-        id_attendance=f"A-{datetime.now().timestamp()}",
-        employee=employee,
-        check_in_time=datetime.now().time()
-    )
-
     return Response({"message": "Entrada registrada correctamente"})
 
 
 @api_view(['POST'])
-@permission_classes([AllowAny])
+@authentication_classes([KioskDeviceAuthentication])
+@permission_classes([IsKioskDevice])
 def check_out(request):
     document_id = request.data.get('document_id')
 
     if not document_id:
         return Response({"error": "document_id requerido"}, status=400)
 
-    try:
-        employee = Employee.objects.get(document_id=document_id)
-    except Employee.DoesNotExist:
+    employee = employee_cache.get(document_id)
+
+    if employee is None:
         return Response({"error": "Empleado no existe"}, status=404)
 
-    today = datetime.now().date()
+    if not record_check_out(employee):
+        return Response({"error": "No hay check-in registrado hoy"}, status=409)
 
-    attendance = Attendance.objects.filter(employee=employee, date=today).first()
+    return Response({"message": "Salida registrada correctamente"})
 
-    if not attendance:
-        return Response({"error": "No hay check-in registrado hoy"}, status=409)
 
-    attendance.check_out_time = datetime.now().time()
-    attendance.save()
+@api_view(['POST'])
+@authentication_classes([KioskDeviceAuthentication])
+@permission_classes([IsKioskDevice])
+def batch_events(request):
+    """
+    Replay check-ins/check-outs buffered by a kiosk while it was offline.
+    Expects {"events": [{document_id, client_timestamp, kind}, ...]} and
+    returns one result per event, in the same order.
+    """
+    events = request.data.get('events')
+
+    if not isinstance(events, list) or not events:
+        return Response({"error": "events requerido"}, status=400)
+
+    max_events = getattr(settings, 'ATTENDANCE_BATCH_MAX_EVENTS', 1000)
+    if len(events) > max_events:
+        return Response({"error": f"Máximo {max_events} eventos por lote"}, status=400)
+
+    return Response({"results": process_events(events, device=request.auth)})
 
-    return Response({"message": "Salida registrada correctamente"})
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@attendance_list_cache
+@conditional(['attendance'])
 def list_all_attendance(request):
-    data = list(Attendance.objects.all().values())
-    return Response(data)
+    """
+    Attendance records ordered by (date, id), one page at a time.
+    Follow the Link/X-Next-Cursor header to fetch the next page.
+    Filters: date_from, date_to, employee, status. ?fields= / ?exclude=
+    narrow the columns selected and returned. Pages are served from the
+    response cache until the next attendance write, and carry an ETag that
+    changes with it (If-None-Match gets a 304 while nothing was written).
+    """
+    paginator = AttendancePagination()
+    fields = sparse_fields(request.query_params, ATTENDANCE_FIELDS)
+    queryset = select_values(Attendance.objects, fields, paginator.ordering)
+    queryset = filter_attendance(queryset, request.query_params)
+    data = paginator.paginate_queryset(queryset, request)
+    return paginator.get_paginated_response(strip_values(data, fields))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_attendance(request):
+    """
+    Full attendance dump for payroll, streamed as ?output=json (default), ndjson
+    or csv. CSV adds worked time and employee columns, one line per attendance
+    or, with ?group=employee, one line per employee for the period.
+    Accepts the date_from, date_to and employee filters; json/ndjson also
+    take ?fields= / ?exclude=.
+    """
+    export_format = request.query_params.get('output', 'json')
+
+    if export_format not in EXPORT_FORMATS:
+        return Response({"error": "output debe ser 'json', 'ndjson' o 'csv'"}, status=400)
+
+    if export_format == 'csv':
+        group = request.query_params.get('group', 'attendance')
+        if group not in PAYROLL_GROUPS:
+            return Response({"error": "group debe ser 'attendance' o 'employee'"}, status=400)
+        return stream_payroll_csv(request.query_params, group)
+
+    return stream_attendance(request.query_params, export_format)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def attendance_summary(request):
+    """
+    Dashboard counters for one day (?date=AAAA-MM-DD, default today), read
+    from the daily summary table. ?role= narrows it to a single row.
+    """
+    day = request.query_params.get('date')
+    try:
+        day = parse_date(day) if day else timezone.localdate()
+    except ValueError:
+        day = None
+    if day is None:
+        return Response({"date": "Fecha inválida, use AAAA-MM-DD"}, status=400)
+
+    rows = DailyAttendanceSummary.objects.filter(date=day)
+    if 'role' in request.query_params:
+        rows = rows.filter(role=request.query_params['role'])
+
+    by_role = [
+        {
+            "role": row.role,
+            "checked_in": row.checked_in,
+            "late": row.late,
+            "checked_out": row.checked_out,
+            "missing_check_out": row.missing_check_out,
+            "minutes_worked": row.minutes_worked,
+        }
+        for row in rows
+    ]
+    totals = {
+        name: sum(row[name] for row in by_role)
+        for name in ("checked_in", "late", "checked_out", "missing_check_out", "minutes_worked")
+    }
+    return Response({"date": day, **totals, "by_role": by_role})
@@ -0,0 +1,27 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _reset_worker_caches():
+    """
+    Per-worker caches outlive the test transaction rollback (no signals fire),
+    so start every test with them empty.
+    """
+    from administrator.blacklist import blacklisted_jtis
+    from administrator.last_login import last_login_buffer
+    from administrator.throttling import login_throttle
+    from attendance.devices import device_cache
+    from django.core.cache import caches
+    from employees.cache import employee_cache
+    from rightOnTime.response_cache import ResponseCache
+
+    employee_cache.clear()
+    blacklisted_jtis.clear()
+    last_login_buffer.clear()
+    device_cache.clear()
+    for cache in caches.all():
+        cache.clear()
+    for response_cache in ResponseCache.instances:
+        response_cache.reset_stats()
+    login_throttle.reset_stats()
+    yield
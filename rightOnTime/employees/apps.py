@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class EmployeesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'employees'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from rightOnTime import shared_cache  # noqa: F401  (registers the cache check)
+        from . import signals  # noqa: F401
+        from .search import create_search_index
+
+        post_migrate.connect(create_search_index, sender=self)
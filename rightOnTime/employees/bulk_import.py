@@ -0,0 +1,186 @@
+"""
+Bulk employee import from an uploaded CSV or NDJSON file.
+
+The file is read line by line and handled `chunk_size` rows at a time:
+field validators run per row in Python (Model.clean_fields), uniqueness is
+checked with one query per chunk plus the values already seen in the file,
+and the valid rows are written with a single bulk_create.
+"""
+import csv
+import io
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from rightOnTime.response_cache import bump
+from .models import Employee
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+IMPORT_FIELDS = (
+    'id_employee', 'phone_number', 'name', 'lastname', 'document_id',
+    'role', 'contract_date', 'state',
+)
+
+UNIQUE_FIELDS = ('id_employee', 'phone_number', 'document_id')
+
+
+def _chunk_size():
+    return getattr(settings, 'EMPLOYEE_IMPORT_CHUNK_SIZE', 1000)
+
+
+def import_format(uploaded, requested=None):
+    """?input= wins; otherwise .ndjson/.jsonl files are NDJSON and the rest CSV."""
+    if requested:
+        return requested
+    if uploaded.name.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return 'csv'
+
+
+def _read_csv(text):
+    reader = csv.DictReader(text)
+    if not reader.fieldnames:
+        raise ValidationError({"file": "El archivo está vacío"})
+    missing = [name for name in UNIQUE_FIELDS + ('name', 'lastname') if name not in reader.fieldnames]
+    if missing:
+        raise ValidationError({"file": f"Faltan columnas: {', '.join(missing)}"})
+    unknown = [name for name in reader.fieldnames if name not in IMPORT_FIELDS]
+    if unknown:
+        raise ValidationError({"file": f"Columnas desconocidas: {', '.join(unknown)}"})
+    for row in reader:
+        # Line of the spreadsheet, counting the header as line 1
+        if None in row:
+            yield reader.line_num, None, "La fila tiene más valores que columnas"
+        else:
+            yield reader.line_num, row, None
+
+
+def _read_ndjson(text):
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None, "JSON inválido"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Se esperaba un objeto JSON"
+            continue
+        yield line_number, row, None
+
+
+def _build(row):
+    """Unsaved Employee from one input row, or a {field: [messages]} dict."""
+    unknown = sorted(set(row) - set(IMPORT_FIELDS))
+    if unknown:
+        return None, {"non_field_errors": [f"Columnas desconocidas: {', '.join(unknown)}"]}
+
+    # Empty CSV cells mean "use the model default"
+    values = {name: value for name, value in row.items() if value not in ('', None)}
+    nested = {name: ["Se esperaba un valor simple"] for name, value in values.items() if isinstance(value, (dict, list))}
+    if nested:
+        return None, nested
+    # NDJSON numbers and booleans are validated like the CSV text they stand for
+    employee = Employee(**{name: str(value) for name, value in values.items()})
+    try:
+        employee.clean_fields()
+    except DjangoValidationError as exc:
+        return None, exc.message_dict
+    return employee, None
+
+
+def _unique_error(field):
+    return Employee().unique_error_message(Employee, (field,)).messages
+
+
+class EmployeeImport:
+    """Runs one import and collects its per-row report."""
+
+    def __init__(self, chunk_size=None):
+        self.chunk_size = chunk_size or _chunk_size()
+        self.created = 0
+        self.errors = []
+        self.seen = {field: set() for field in UNIQUE_FIELDS}
+
+    def run(self, uploaded, input_format):
+        text = io.TextIOWrapper(uploaded.file, encoding='utf-8-sig', newline='')
+        rows = _read_ndjson(text) if input_format == 'ndjson' else _read_csv(text)
+        chunk = []
+        try:
+            # One transaction: a broken file rolls the whole import back
+            with transaction.atomic():
+                for line, row, error in rows:
+                    if error is not None:
+                        self.errors.append({"line": line, "errors": {"non_field_errors": [error]}})
+                        continue
+                    employee, errors = _build(row)
+                    if errors:
+                        self.errors.append({"line": line, "errors": errors})
+                        continue
+                    chunk.append((line, employee))
+                    if len(chunk) >= self.chunk_size:
+                        self._flush(chunk)
+                        chunk = []
+                if chunk:
+                    self._flush(chunk)
+        except UnicodeDecodeError:
+            raise ValidationError({"file": "El archivo debe estar en UTF-8"})
+        except csv.Error as exc:
+            raise ValidationError({"file": f"CSV inválido: {exc}"})
+
+        self.errors.sort(key=lambda entry: entry["line"])
+        return {"created": self.created, "failed": len(self.errors), "errors": self.errors}
+
+    def _flush(self, chunk):
+        taken = self._existing(chunk)
+        valid = []
+        for line, employee in chunk:
+            errors = {}
+            for field in UNIQUE_FIELDS:
+                value = getattr(employee, field)
+                if value in taken[field] or value in self.seen[field]:
+                    errors[field] = _unique_error(field)
+            if errors:
+                self.errors.append({"line": line, "errors": errors})
+                continue
+            for field in UNIQUE_FIELDS:
+                self.seen[field].add(getattr(employee, field))
+            valid.append((line, employee))
+
+        try:
+            with transaction.atomic():
+                Employee.objects.bulk_create([employee for _, employee in valid])
+            self.created += len(valid)
+            bump('employees')
+        except IntegrityError:
+            # Lost a race with a concurrent write: fall back to row by row
+            self._insert_one_by_one(valid)
+
+    def _existing(self, chunk):
+        """Values of the chunk's unique fields already in the table, in one query."""
+        wanted = {field: {getattr(employee, field) for _, employee in chunk} for field in UNIQUE_FIELDS}
+        condition = Q()
+        for field, values in wanted.items():
+            condition |= Q(**{f'{field}__in': values})
+        taken = {field: set() for field in UNIQUE_FIELDS}
+        # all_objects: soft-deleted employees still hold their unique values
+        for existing in Employee.all_objects.filter(condition).order_by().values_list(*UNIQUE_FIELDS):
+            for field, value in zip(UNIQUE_FIELDS, existing):
+                if value in wanted[field]:
+                    taken[field].add(value)
+        return taken
+
+    def _insert_one_by_one(self, valid):
+        for line, employee in valid:
+            try:
+                with transaction.atomic():
+                    employee.save(force_insert=True)
+                self.created += 1
+            except IntegrityError:
+                self.errors.append({"line": line, "errors": {"non_field_errors": ["Empleado duplicado"]}})
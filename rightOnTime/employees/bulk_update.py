@@ -0,0 +1,59 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from rightOnTime.response_cache import bump
+from .cache import employee_cache
+from .models import Employee
+
+# Fields a bulk PATCH may change
+BULK_UPDATE_FIELDS = ('state', 'role')
+
+
+def clean_delta(data):
+    """Validate {"set": {...}} against the model fields; returns the cleaned values."""
+    delta = data.get('set')
+    if not isinstance(delta, dict) or not delta:
+        raise ValidationError({"set": "set requerido, p. ej. {\"state\": \"inactive\"}"})
+
+    unknown = sorted(set(delta) - set(BULK_UPDATE_FIELDS))
+    if unknown:
+        raise ValidationError({"set": f"Campos no permitidos: {', '.join(unknown)}"})
+
+    cleaned, errors = {}, {}
+    for name, value in delta.items():
+        try:
+            cleaned[name] = Employee._meta.get_field(name).clean(value, None)
+        except DjangoValidationError as exc:
+            errors[name] = exc.messages
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
+
+
+def clean_ids(data):
+    ids = data.get('ids')
+    if ids is None:
+        return None
+    if not isinstance(ids, list) or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+        raise ValidationError({"ids": "Debe ser una lista de ids numéricos"})
+    return ids
+
+
+def bulk_update_employees(queryset, delta, ids=None):
+    """
+    Apply `delta` to every row of `queryset` (narrowed to `ids` if given)
+    with a single UPDATE; returns the number of rows matched.
+    """
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+    updated = queryset.order_by().update(**delta, updated_at=timezone.now())
+
+    # update() sends no post_save, so drop the cached kiosk lookups by hand
+    if ids is not None:
+        for pk in ids:
+            employee_cache.invalidate(pk=pk)
+    else:
+        employee_cache.clear()
+    bump('employees')
+    return updated
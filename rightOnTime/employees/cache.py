@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from rightOnTime.response_cache import aversions, versions
+from .models import Employee
+
+# Response-cache namespace bumped by every employee write
+NAMESPACE = 'employees'
+
+CachedEmployee = namedtuple('CachedEmployee', ['pk', 'state', 'role'])
+
+# Same coercion as the serializers: 123 and "123" pass; 12.5, true and "12a" do not
+_document_id_field = serializers.IntegerField()
+
+
+def parse_document_id(value):
+    """The integer document_id a kiosk sent, or None if it is not one."""
+    try:
+        return _document_id_field.run_validation(value)
+    except ValidationError:
+        return None
+
+
+class EmployeeLookupCache:
+    """
+    Per-worker LRU cache mapping document_id -> (pk, state, role).
+
+    Writes in this worker invalidate immediately via signals. Writes in
+    other workers bump the shared 'employees' version (the response cache's,
+    see rightOnTime.response_cache); a lookup reads it at most every
+    `version_check` seconds and empties the cache when it moved, so other
+    workers stop serving a changed employee within that interval. Entries
+    also expire after `ttl` seconds, as a backstop for a lost version.
+    """
+
+    def __init__(self, max_size, ttl, version_check):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version_check = version_check
+        self._entries = OrderedDict()  # document_id -> (CachedEmployee, expires_at)
+        self._keys_by_pk = {}  # pk -> document_id, to invalidate renamed documents
+        self._version = None
+        self._version_checked_until = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, document_id):
+        """Return the CachedEmployee for `document_id`, or None if it does not exist."""
+        key = self._key(document_id)
+        if key is None:
+            return None
+        if self._version_due():
+            self._sync_version(versions([NAMESPACE])[0])
+        employee = self._cached(key)
+        if employee is not None:
+            return employee
+        try:
+            row = self._lookup(key).get()
+        except Employee.DoesNotExist:
+            row = None
+        return self._remember(key, row)
+
+    async def aget(self, document_id):
+        """Async variant of get(); a cache hit never leaves the event loop."""
+        key = self._key(document_id)
+        if key is None:
+            return None
+        if self._version_due():
+            self._sync_version((await aversions([NAMESPACE]))[0])
+        employee = self._cached(key)
+        if employee is not None:
+            return employee
+        try:
+            row = await self._lookup(key).aget()
+        except Employee.DoesNotExist:
+            row = None
+        return self._remember(key, row)
+
+    @staticmethod
+    def _lookup(key):
+        # get() drops Meta.ordering, so this stays a plain unique-index probe
+        return Employee.objects.filter(document_id=key).values_list('pk', 'state', 'role')
+
+    @staticmethod
+    def _key(document_id):
+        return parse_document_id(document_id)
+
+    def _version_due(self):
+        with self._lock:
+            return time.monotonic() >= self._version_checked_until
+
+    def _sync_version(self, version):
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    # An employee changed somewhere; any entry may be stale
+                    self._entries.clear()
+                    self._keys_by_pk.clear()
+                self._version = version
+            self._version_checked_until = time.monotonic() + self.version_check
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def _remember(self, key, row):
+        if row is None:
+            return None
+        employee = CachedEmployee(*row)
+        with self._lock:
+            self._entries[key] = (employee, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._keys_by_pk[employee.pk] = key
+            while len(self._entries) > self.max_size:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._keys_by_pk.pop(evicted.pk, None)
+        return employee
+
+    def invalidate(self, pk=None, document_id=None):
+        """Drop the entries for an employee, by pk and/or document_id."""
+        with self._lock:
+            keys = {document_id, self._keys_by_pk.pop(pk, None)}
+            for key in keys - {None}:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._keys_by_pk.pop(entry[0].pk, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_pk.clear()
+            self._version_checked_until = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "version_check": self.version_check,
+            }
+
+
+employee_cache = EmployeeLookupCache(
+    max_size=getattr(settings, 'EMPLOYEE_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'EMPLOYEE_CACHE_TTL', 300),
+    version_check=getattr(settings, 'EMPLOYEE_CACHE_VERSION_CHECK', 1),
+)
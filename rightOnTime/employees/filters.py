@@ -0,0 +1,44 @@
+from rest_framework.filters import BaseFilterBackend
+
+from rightOnTime.query_params import date_param
+from rightOnTime.sparse_fields import schema_parameters
+
+
+class EmployeeFilterBackend(BaseFilterBackend):
+    """
+    Roster filters: ?state=, ?role=, ?contract_date_from= / ?contract_date_to=
+    (inclusive, AAAA-MM-DD). Each one has an index that also covers the
+    (id_employee, id) page order.
+    """
+    filter_params = ('state', 'role', 'contract_date_from', 'contract_date_to')
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        contract_from = date_param(params, 'contract_date_from')
+        contract_to = date_param(params, 'contract_date_to')
+
+        if params.get('state'):
+            queryset = queryset.filter(state=params['state'])
+        if params.get('role'):
+            queryset = queryset.filter(role=params['role'])
+        if contract_from:
+            queryset = queryset.filter(contract_date__gte=contract_from)
+        if contract_to:
+            queryset = queryset.filter(contract_date__lte=contract_to)
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': 'q', 'required': False, 'in': 'query',
+             'description': 'Typeahead over name, lastname, document_id and phone_number; '
+                            'returns one ranked page of at most ?limit= rows.',
+             'schema': {'type': 'string'}},
+            {'name': 'limit', 'required': False, 'in': 'query', 'schema': {'type': 'integer'}},
+            {'name': 'state', 'required': False, 'in': 'query', 'schema': {'type': 'string'}},
+            {'name': 'role', 'required': False, 'in': 'query', 'schema': {'type': 'string'}},
+            {'name': 'contract_date_from', 'required': False, 'in': 'query',
+             'schema': {'type': 'string', 'format': 'date'}},
+            {'name': 'contract_date_to', 'required': False, 'in': 'query',
+             'schema': {'type': 'string', 'format': 'date'}},
+            *schema_parameters(),
+        ]
@@ -0,0 +1,74 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from attendance.models import Attendance
+from attendance import summary
+from employees.models import Employee
+from rightOnTime.response_cache import bump, bumps_deferred
+
+
+class Command(BaseCommand):
+    help = (
+        'Hard-delete soft-deleted employees and their attendance history, '
+        'a small chunk per transaction so kiosk writes are never blocked for long.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=getattr(settings, 'EMPLOYEE_PURGE_CHUNK_SIZE', 500),
+            help='Rows deleted per transaction (default 500)',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.05,
+            help='Seconds to pause between chunks (default 0.05)',
+        )
+
+    def handle(self, *args, **options):
+        # One cache version bump per namespace for the whole purge, not one per row
+        with bumps_deferred():
+            self.purge(options)
+
+    def purge(self, options):
+        chunk_size = max(options['chunk_size'], 1)
+        pause = options['sleep']
+
+        attendances = 0
+        days = set()
+        pending = Attendance.objects.filter(employee__state=Employee.DELETED).order_by()
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    pending.select_for_update(of=('self',))
+                    .values_list('pk', *summary.ROW_FIELDS)[:chunk_size]
+                )
+                if not rows:
+                    break
+                # One DELETE ... WHERE id IN, skipping the collector: nothing
+                # references Attendance and the summary is adjusted right here
+                chunk = Attendance.objects.filter(pk__in=[row[0] for row in rows])
+                attendances += chunk._raw_delete(chunk.db)
+                summary.record_changes(removed=[row[1:] for row in rows])
+            days.update(row[1] for row in rows)
+            bump('attendance')
+            time.sleep(pause)
+
+        employees = 0
+        while True:
+            pks = list(
+                Employee.all_objects.filter(state=Employee.DELETED)
+                .order_by().values_list('pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                employees += Employee.all_objects.filter(pk__in=pks).delete()[1].get(Employee._meta.label, 0)
+            time.sleep(pause)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {employees} employees and {attendances} attendance records '
+            f'({len(days)} summary days adjusted).'
+        ))
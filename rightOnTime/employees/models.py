@@ -1,8 +1,17 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+class EmployeeManager(models.Manager):
+    # Los empleados eliminados (borrado lógico) no aparecen en las consultas normales
+    def get_queryset(self):
+        return super().get_queryset().exclude(state=Employee.DELETED)
+
+
 class Employee(models.Model):
+    DELETED = 'deleted'
+
     id_employee = models.CharField(
         max_length=50,
         unique=True,
@@ -63,7 +72,7 @@ class Employee(models.Model):
 
     state = models.CharField(
         max_length=20,
-        choices=(('active', 'Activo'), ('inactive', 'Inactivo')),
+        choices=(('active', 'Activo'), ('inactive', 'Inactivo'), (DELETED, 'Eliminado')),
         default='active',
         verbose_name='Estado'
     )
@@ -78,10 +87,33 @@ class Employee(models.Model):
         verbose_name='Fecha de actualización'
     )
 
+    objects = EmployeeManager()
+    all_objects = models.Manager()  # Incluye los eliminados (unicidad, purga)
+
     class Meta:
         verbose_name = 'Empleado'
         verbose_name_plural = 'Empleados'
         ordering = ['id_employee']
+        default_manager_name = 'objects'
+        # Las relaciones (attendance.employee) siguen viendo a los eliminados
+        base_manager_name = 'all_objects'
+        indexes = [
+            # Filtros del listado + orden de la paginación por cursor (id_employee, id)
+            models.Index(fields=['state', 'id_employee', 'id'], name='employee_state_page_idx'),
+            models.Index(fields=['role', 'id_employee', 'id'], name='employee_role_page_idx'),
+            models.Index(fields=['contract_date'], name='employee_contract_date_idx'),
+            # Índice parcial: el listado por defecto solo recorre empleados no eliminados
+            models.Index(
+                fields=['id_employee', 'id'],
+                condition=~Q(state='deleted'),
+                name='employee_live_page_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.id_employee} - {self.name} {self.lastname}'
+
+    def soft_delete(self):
+        """Borrado lógico: conserva el historial de asistencia (ver purge_deleted_employees)."""
+        self.state = self.DELETED
+        self.save(update_fields=['state', 'updated_at'])
@@ -0,0 +1,10 @@
+from django.conf import settings
+
+from rightOnTime.pagination import KeysetPagination
+
+
+class EmployeePagination(KeysetPagination):
+    """Keyset pagination for the roster, served by the (…, id_employee, id) indexes."""
+    ordering = ('id_employee', 'id')
+    page_size = getattr(settings, 'EMPLOYEE_PAGE_SIZE', 100)
+    max_page_size = getattr(settings, 'EMPLOYEE_MAX_PAGE_SIZE', 1000)
@@ -0,0 +1,182 @@
+"""
+Roster typeahead (?q=) over name, lastname, document_id and phone_number.
+
+Each backend gets its own index, created outside the ORM by
+create_search_index() on post_migrate:
+
+- PostgreSQL: pg_trgm GIN indexes on lower(name || ' ' || lastname) and on
+  the digits of document_id/phone_number. Serves fuzzy (%) and substring
+  (LIKE) matches, ranked by similarity with prefix hits first.
+- SQLite: an external-content FTS5 table kept in sync by triggers. Serves
+  word-prefix matches, ranked by bm25.
+- Anything else falls back to icontains/startswith, ordered by id_employee.
+"""
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Employee
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = f'{Employee._meta.db_table}_fts'
+
+_index_available = {}  # connection alias -> bool
+
+
+def search_limit(requested=None):
+    """Cap on typeahead results; ?limit= can lower or raise it up to the max."""
+    default = getattr(settings, 'EMPLOYEE_SEARCH_LIMIT', 20)
+    maximum = getattr(settings, 'EMPLOYEE_SEARCH_MAX_LIMIT', 100)
+    if requested is None:
+        return default
+    return min(max(requested, 1), maximum)
+
+
+def search_employees(queryset, term, limit):
+    """Rank `queryset` against `term` and return the best `limit` rows."""
+    connection = connections[queryset.db]
+
+    if connection.vendor == 'postgresql' and _has_index(connection):
+        queryset = _search_postgresql(queryset, term)
+    elif connection.vendor == 'sqlite' and _has_index(connection):
+        queryset = _search_sqlite(queryset, term)
+    else:
+        queryset = _search_fallback(queryset, term)
+
+    return queryset[:limit]
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _search_postgresql(queryset, term):
+    table = connections[queryset.db].ops.quote_name(Employee._meta.db_table)
+    full_name = f"lower({table}.name || ' ' || {table}.lastname)"
+    digits = f"({table}.document_id::text)"
+    phone = f"({table}.phone_number::text)"
+
+    term = term.lower()
+    prefix = _escape_like(term) + '%'
+    contains = '%' + _escape_like(term) + '%'
+
+    # Prefix hits (name or digits) outrank substring/fuzzy ones
+    rank = RawSQL(
+        f"similarity({full_name}, %s)"
+        f" + CASE WHEN {full_name} LIKE %s THEN 1 ELSE 0 END"
+        f" + CASE WHEN {digits} LIKE %s OR {phone} LIKE %s THEN 1 ELSE 0 END",
+        [term, prefix, prefix, prefix],
+    )
+    # "%%" is pg_trgm's similarity operator, escaped for the DB-API driver
+    matches = RawSQL(
+        f"({full_name} %% %s OR {full_name} LIKE %s"
+        f" OR {digits} LIKE %s OR {phone} LIKE %s)",
+        [term, contains, contains, contains],
+        output_field=BooleanField(),
+    )
+    return (
+        queryset
+        .filter(matches)
+        .annotate(search_rank=rank)
+        .order_by('-search_rank', 'id_employee', 'id')
+    )
+
+
+def _fts_query(term):
+    """Every word of the term must prefix-match some column: "juan"* "pe"*."""
+    words = [word.replace('"', '""') for word in term.split()]
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _search_sqlite(queryset, term):
+    table = Employee._meta.db_table
+    match = _fts_query(term)
+    rank = RawSQL(
+        f'(SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE}'
+        f' WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = "{table}"."id")',
+        [match],
+    )
+    return (
+        queryset
+        .filter(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]))
+        .annotate(search_rank=rank)
+        .order_by('-search_rank', 'id_employee', 'id')
+    )
+
+
+def _search_fallback(queryset, term):
+    condition = Q(name__icontains=term) | Q(lastname__icontains=term)
+    if term.isdigit():
+        condition |= Q(document_id__startswith=term) | Q(phone_number__startswith=term)
+    return queryset.filter(condition).order_by('id_employee', 'id')
+
+
+def _has_index(connection):
+    """Whether create_search_index() succeeded on this database (checked once per worker)."""
+    if connection.alias not in _index_available:
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                available = cursor.fetchone() is not None
+        else:
+            available = FTS_TABLE in connection.introspection.table_names()
+        _index_available[connection.alias] = available
+    return _index_available[connection.alias]
+
+
+POSTGRESQL_INDEX_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS employee_full_name_trgm_idx ON {table}"
+    " USING gin ((lower(name || ' ' || lastname)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS employee_document_trgm_idx ON {table}"
+    " USING gin ((document_id::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS employee_phone_trgm_idx ON {table}"
+    " USING gin ((phone_number::text) gin_trgm_ops)",
+]
+
+SQLITE_INDEX_SQL = [
+    "CREATE VIRTUAL TABLE {fts} USING fts5("
+    "name, lastname, document_id, phone_number,"
+    " content='{table}', content_rowid='id',"
+    " tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN"
+    " INSERT INTO {fts}(rowid, name, lastname, document_id, phone_number)"
+    " VALUES (new.id, new.name, new.lastname, new.document_id, new.phone_number); END",
+    "CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN"
+    " INSERT INTO {fts}({fts}, rowid, name, lastname, document_id, phone_number)"
+    " VALUES ('delete', old.id, old.name, old.lastname, old.document_id, old.phone_number); END",
+    "CREATE TRIGGER {fts}_au AFTER UPDATE OF name, lastname, document_id, phone_number ON {table} BEGIN"
+    " INSERT INTO {fts}({fts}, rowid, name, lastname, document_id, phone_number)"
+    " VALUES ('delete', old.id, old.name, old.lastname, old.document_id, old.phone_number);"
+    " INSERT INTO {fts}(rowid, name, lastname, document_id, phone_number)"
+    " VALUES (new.id, new.name, new.lastname, new.document_id, new.phone_number); END",
+    # Index whatever rows were already there
+    "INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+]
+
+
+def create_search_index(using='default', **kwargs):
+    """post_migrate hook: create the vendor-specific search index if missing."""
+    connection = connections[using]
+    _index_available.pop(using, None)
+
+    if connection.vendor == 'postgresql':
+        statements = POSTGRESQL_INDEX_SQL
+    elif connection.vendor == 'sqlite':
+        if FTS_TABLE in connection.introspection.table_names():
+            return
+        statements = SQLITE_INDEX_SQL
+    else:
+        return
+
+    try:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement.format(table=Employee._meta.db_table, fts=FTS_TABLE))
+    except DatabaseError:
+        # Missing pg_trgm privileges / FTS5 support: ?q= falls back to icontains
+        logger.exception('Could not create the employee search index')
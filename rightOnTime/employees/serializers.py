@@ -1,12 +1,66 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework.utils.field_mapping import get_unique_error_message
+from rest_framework.validators import UniqueValidator
+from rightOnTime.sparse_fields import SparseFieldsSerializerMixin
 from .models import Employee
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for Employee model.
     Handles conversion between Employee objects and JSON format.
-    Includes all model fields automatically.
+    Includes all model fields automatically, or only the ones the view
+    passes in context['fields'] (?fields= / ?exclude=).
+
+    Uniqueness is left to the database: no SELECT per unique field before
+    writing. A violated unique index comes back as the same field error
+    DRF's UniqueValidator would have raised.
     """
     class Meta:
         model = Employee  # The Django model to serialize
-        fields = '__all__'  # Include all fields from the Employee model
\ No newline at end of file
+        fields = '__all__'  # Include all fields from the Employee model
+
+    def build_standard_field(self, field_name, model_field):
+        field_class, field_kwargs = super().build_standard_field(field_name, model_field)
+        if 'validators' in field_kwargs:
+            field_kwargs['validators'] = [
+                validator for validator in field_kwargs['validators']
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return field_class, field_kwargs
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(self.unique_errors(validated_data))
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(self.unique_errors(validated_data, instance))
+
+    def unique_errors(self, validated_data, instance=None):
+        """Which unique fields clashed, found with one query on the error path only."""
+        unique_fields = [
+            name for name, value in validated_data.items()
+            if Employee._meta.get_field(name).unique and value is not None
+        ]
+        condition = Q()
+        for name in unique_fields:
+            condition |= Q(**{name: validated_data[name]})
+
+        errors = {}
+        if unique_fields:
+            clashes = Employee.all_objects.filter(condition).order_by()
+            if instance is not None:
+                clashes = clashes.exclude(pk=instance.pk)
+            for row in clashes.values(*unique_fields):
+                for name in unique_fields:
+                    if row[name] == validated_data[name]:
+                        errors[name] = [get_unique_error_message(Employee._meta.get_field(name))]
+        return errors or {"non_field_errors": ["Empleado duplicado"]}
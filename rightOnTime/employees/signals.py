@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rightOnTime.response_cache import bump
+from .cache import employee_cache
+from .models import Employee
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def invalidate_employee_cache(sender, instance, **kwargs):
+    """Keep the document_id lookup cache in sync with EmployeeViewSet/admin writes."""
+    employee_cache.invalidate(pk=instance.pk, document_id=instance.document_id)
+    bump('employees')
+
+
+@receiver(post_delete, sender=Employee)
+def invalidate_cascaded_attendance(sender, instance, **kwargs):
+    """A hard delete takes the employee's attendance with it (without signals)."""
+    bump('attendance')
@@ -1,3 +1,952 @@
+import io
+from datetime import date
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+
+from administrator.models import Administrator
+from .cache import EmployeeLookupCache, employee_cache
+from .models import Employee
+
+
+class EmployeeLookupCacheTest(TestCase):
+    """Test cases for the document_id -> employee lookup cache"""
+
+    def setUp(self):
+        self.employee = Employee.objects.create(
+            id_employee="EMP-C1",
+            document_id=7001001,
+            name="Cache",
+            lastname="Hit",
+            phone_number=3005550001,
+            contract_date=date.today()
+        )
+        self.cache = EmployeeLookupCache(max_size=2, ttl=60, version_check=60)
+
+    def test_second_lookup_is_served_from_cache(self):
+        """Test repeated lookups skip the database"""
+        first = self.cache.get(7001001)
+        with self.assertNumQueries(0):
+            second = self.cache.get("7001001")
+        self.assertEqual(first, second)
+        self.assertEqual(second.pk, self.employee.pk)
+        self.assertEqual(second.state, 'active')
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_unknown_document_is_not_cached(self):
+        """Test missing employees are looked up every time"""
+        self.assertIsNone(self.cache.get(7009999))
+        self.assertIsNone(self.cache.get("not-a-number"))
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_lru_eviction(self):
+        """Test the cache never grows past max_size"""
+        for index in range(2):
+            Employee.objects.create(
+                id_employee=f"EMP-C{index + 2}",
+                document_id=7001002 + index,
+                name="Cache",
+                lastname="Evict",
+                phone_number=3005550002 + index,
+                contract_date=date.today()
+            )
+        self.cache.get(7001001)
+        self.cache.get(7001002)
+        self.cache.get(7001001)
+        self.cache.get(7001003)
+        self.assertEqual(self.cache.stats()['size'], 2)
+        with self.assertNumQueries(0):
+            self.cache.get(7001001)
+
+    def test_expired_entries_are_reloaded(self):
+        """Test entries are refreshed after their TTL"""
+        cache = EmployeeLookupCache(max_size=10, ttl=0, version_check=60)
+        cache.get(7001001)
+        with self.assertNumQueries(1):
+            cache.get(7001001)
+
+    def test_writes_in_other_workers_invalidate_entries(self):
+        """Test a bumped 'employees' version empties the cache of a worker that missed the write"""
+        from rightOnTime.response_cache import bump
+        cache = EmployeeLookupCache(max_size=10, ttl=60, version_check=0)
+        self.assertEqual(cache.get(7001001).state, 'active')
+        # What another worker's bulk PATCH leaves behind: the row and the shared version
+        Employee.objects.filter(pk=self.employee.pk).update(state='inactive')
+        bump('employees')
+        self.assertEqual(cache.get(7001001).state, 'inactive')
+
+    def test_save_signal_invalidates_entry(self):
+        """Test writes to Employee drop the cached entry, even on renamed documents"""
+        employee_cache.get(7001001)
+        self.employee.state = 'inactive'
+        self.employee.document_id = 7001500
+        self.employee.save()
+        self.assertIsNone(employee_cache.get(7001001))
+        self.assertEqual(employee_cache.get(7001500).state, 'inactive')
+
+    def test_delete_signal_invalidates_entry(self):
+        """Test deleting an employee drops the cached entry"""
+        employee_cache.get(7001001)
+        self.employee.delete()
+        self.assertIsNone(employee_cache.get(7001001))
+
+
+class EmployeeCacheStatsViewTest(APITestCase):
+    """Test cases for the cache-stats action"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="stats",
+            email="stats@test.com",
+            password="testpass123",
+            id_administrator="ADM-STATS",
+            phone_number=3005550100
+        )
+
+    def test_cache_stats_requires_authentication(self):
+        """Test cache stats are not public"""
+        response = self.client.get('/employees/cache-stats/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cache_stats(self):
+        """Test cache stats expose hit/miss counters"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/employees/cache-stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hits', response.data)
+        self.assertIn('misses', response.data)
+
+
+class EmployeeListPaginationTest(APITestCase):
+    """Test cases for the keyset-paginated, filterable employee list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="roster",
+            email="roster@test.com",
+            password="testpass123",
+            id_administrator="ADM-ROSTER",
+            phone_number=3005550101
+        )
+        self.client.force_authenticate(user=self.user)
+        for i in range(5):
+            Employee.objects.create(
+                id_employee=f"EMP-{i:03d}",
+                phone_number=3100000000 + i,
+                name=f"Nombre{i}",
+                lastname="Apellido",
+                document_id=20000000 + i,
+                role="Cashier" if i % 2 else "Employee",
+                state="inactive" if i == 4 else "active",
+                contract_date=date(2024, 1, 1 + i),
+            )
+
+    def test_pages_follow_next_cursor(self):
+        """Test walking every page via X-Next-Cursor returns each employee once, in order"""
+        seen = []
+        url = '/employees/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(row['id_employee'] for row in response.data)
+            cursor = response.get('X-Next-Cursor')
+            url = f'/employees/?page_size=2&cursor={cursor}' if cursor else None
+        self.assertEqual(seen, [f"EMP-{i:03d}" for i in range(5)])
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is rejected"""
+        response = self.client.get('/employees/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filter_by_state_and_role(self):
+        """Test state and role filters combine"""
+        response = self.client.get('/employees/?state=active&role=Cashier')
+        self.assertEqual(
+            [row['id_employee'] for row in response.data],
+            ["EMP-001", "EMP-003"]
+        )
+
+    def test_filter_by_contract_date_range(self):
+        """Test contract date bounds are inclusive"""
+        response = self.client.get(
+            '/employees/?contract_date_from=2024-01-02&contract_date_to=2024-01-03'
+        )
+        self.assertEqual(
+            [row['id_employee'] for row in response.data],
+            ["EMP-001", "EMP-002"]
+        )
+
+    def test_invalid_contract_date(self):
+        """Test malformed dates are a 400"""
+        response = self.client.get('/employees/?contract_date_from=2024-13-01')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('contract_date_from', response.data)
+
+
+class EmployeeSearchTest(APITestCase):
+    """Test cases for the ?q= typeahead search"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="search",
+            email="search@test.com",
+            password="testpass123",
+            id_administrator="ADM-SEARCH",
+            phone_number=3005550102
+        )
+        self.client.force_authenticate(user=self.user)
+        people = [
+            ("EMP-100", "Juan", "Pérez", 10203040, 3111111111),
+            ("EMP-101", "Juana", "Gómez", 55667788, 3122222222),
+            ("EMP-102", "Pedro", "Juanes", 10999999, 3133333333),
+            ("EMP-103", "María", "López", 77777777, 3144444444),
+        ]
+        for id_employee, name, lastname, document_id, phone in people:
+            Employee.objects.create(
+                id_employee=id_employee,
+                name=name,
+                lastname=lastname,
+                document_id=document_id,
+                phone_number=phone,
+            )
+
+    def search(self, query):
+        response = self.client.get('/employees/', {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id_employee'] for row in response.data]
+
+    def test_name_prefix(self):
+        """Test a name prefix matches name and lastname words"""
+        self.assertEqual(sorted(self.search('jua')), ["EMP-100", "EMP-101", "EMP-102"])
+
+    def test_every_word_must_match(self):
+        """Test multi-word queries narrow the results"""
+        self.assertEqual(sorted(self.search('juan pe')), ["EMP-100", "EMP-102"])
+        self.assertEqual(self.search('juan per'), ["EMP-100"])
+
+    def test_accents_are_ignored(self):
+        """Test unaccented input finds accented names"""
+        self.assertEqual(self.search('lopez'), ["EMP-103"])
+
+    def test_partial_document_and_phone(self):
+        """Test leading digits of document_id or phone_number match"""
+        self.assertEqual(sorted(self.search('1020')), ["EMP-100"])
+        self.assertEqual(self.search('31333'), ["EMP-102"])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test the search index stays in sync with writes"""
+        Employee.objects.filter(id_employee="EMP-103").update(lastname="Rodríguez")
+        self.assertEqual(self.search('lopez'), [])
+        self.assertEqual(self.search('rodri'), ["EMP-103"])
+        Employee.objects.filter(id_employee="EMP-103").delete()
+        self.assertEqual(self.search('rodri'), [])
+
+    def test_results_are_capped(self):
+        """Test ?limit= caps the ranked page"""
+        self.assertEqual(len(self.search('jua')), 3)
+        response = self.client.get('/employees/', {'q': 'jua', 'limit': 2})
+        self.assertEqual(len(response.data), 2)
+
+    def test_combines_with_filters(self):
+        """Test the roster filters still apply to search results"""
+        Employee.objects.filter(id_employee="EMP-101").update(state="inactive")
+        response = self.client.get('/employees/', {'q': 'jua', 'state': 'active'})
+        self.assertEqual(
+            sorted(row['id_employee'] for row in response.data),
+            ["EMP-100", "EMP-102"]
+        )
+
+    def test_quotes_in_query(self):
+        """Test FTS syntax characters in the query are treated as text"""
+        self.assertEqual(sorted(self.search('"juan* OR')), [])
+        self.assertEqual(sorted(self.search('"juan')), sorted(self.search('juan')))
+
+    def test_fallback_without_index(self):
+        """Test databases without the search index fall back to icontains"""
+        from . import search
+        with mock.patch.dict(search._index_available, {'default': False}):
+            self.assertEqual(self.search('ópez'), ["EMP-103"])
+            self.assertEqual(self.search('5566'), ["EMP-101"])
+
+
+class EmployeeSparseFieldsTest(APITestCase):
+    """Test cases for ?fields= / ?exclude= on the employee endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="sparse",
+            email="sparse@test.com",
+            password="testpass123",
+            id_administrator="ADM-SPARSE",
+            phone_number=3005550103
+        )
+        self.client.force_authenticate(user=self.user)
+        for i in range(3):
+            Employee.objects.create(
+                id_employee=f"EMP-S{i}",
+                phone_number=3200000000 + i,
+                name=f"Nombre{i}",
+                lastname="Apellido",
+                document_id=30000000 + i,
+            )
+
+    def test_fields_are_pushed_down_to_the_query(self):
+        """Test only the requested columns are selected and returned"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/employees/', {'fields': 'name,document_id', 'page_size': 2})
+        self.assertEqual(
+            response.data,
+            [{'name': 'Nombre0', 'document_id': 30000000}, {'name': 'Nombre1', 'document_id': 30000001}]
+        )
+        select = [query['sql'] for query in queries if 'employees_employee' in query['sql']][0]
+        self.assertNotIn('phone_number', select)
+        self.assertNotIn('created_at', select)
+
+        # The keyset columns are still fetched, so the cursor keeps working
+        response = self.client.get('/employees/', {'fields': 'name', 'cursor': response['X-Next-Cursor']})
+        self.assertEqual(response.data, [{'name': 'Nombre2'}])
+
+    def test_exclude_on_retrieve_and_search(self):
+        """Test ?exclude= applies to detail and search responses"""
+        employee = Employee.objects.get(id_employee="EMP-S0")
+        response = self.client.get(f'/employees/{employee.pk}/', {'exclude': 'created_at,updated_at'})
+        self.assertNotIn('created_at', response.data)
+        self.assertEqual(response.data['id_employee'], "EMP-S0")
+
+        response = self.client.get('/employees/', {'q': 'nombre1', 'fields': 'id_employee'})
+        self.assertEqual(response.data, [{'id_employee': 'EMP-S1'}])
+
+    def test_unknown_field(self):
+        """Test unknown field names are a 400"""
+        response = self.client.get('/employees/', {'fields': 'name,salary'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_ignore_fields(self):
+        """Test ?fields= does not restrict what a PATCH validates or returns"""
+        employee = Employee.objects.get(id_employee="EMP-S0")
+        response = self.client.patch(f'/employees/{employee.pk}/?fields=name', {'lastname': 'Nuevo'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['lastname'], 'Nuevo')
+
+
+class EmployeeBulkImportTest(APITestCase):
+    """Test cases for the bulk import action"""
+
+    HEADER = "id_employee,name,lastname,document_id,phone_number,role,contract_date\n"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="importer",
+            email="importer@test.com",
+            password="testpass123",
+            id_administrator="ADM-IMPORT",
+            phone_number=3005550104
+        )
+        self.client.force_authenticate(user=self.user)
+        Employee.objects.create(
+            id_employee="EMP-OLD",
+            name="Ya",
+            lastname="Existe",
+            document_id=40000000,
+            phone_number=3400000000,
+        )
+
+    def upload(self, content, name='employees.csv', **params):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        upload = SimpleUploadedFile(name, content.encode())
+        url = '/employees/import/'
+        if params:
+            url += '?' + '&'.join(f'{key}={value}' for key, value in params.items())
+        return self.client.post(url, {'file': upload}, format='multipart')
+
+    def test_import_csv(self):
+        """Test valid rows are created with their defaults"""
+        rows = "".join(
+            f"EMP-N{i},Nombre{i},Apellido,{40000001 + i},{3400000001 + i},,2024-05-0{i + 1}\n"
+            for i in range(3)
+        )
+        response = self.upload(self.HEADER + rows)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {"created": 3, "failed": 0, "errors": []})
+        employee = Employee.objects.get(id_employee="EMP-N2")
+        self.assertEqual(employee.role, "Employee")
+        self.assertEqual(employee.contract_date, date(2024, 5, 3))
+
+    def test_uniqueness_is_checked_once_per_chunk(self):
+        """Test duplicates against the table and within the file, with one lookup per chunk"""
+        rows = "".join(
+            f"EMP-C{i},Nombre,Apellido,{41000000 + i},{3410000000 + i},,\n" for i in range(6)
+        )
+        rows += "EMP-OLD,Otro,Duplicado,41999999,3419999999,,\n"   # id_employee taken
+        rows += "EMP-DUP,Otro,Duplicado,41000000,3419999998,,\n"   # document_id repeated in file
+        with self.settings(EMPLOYEE_IMPORT_CHUNK_SIZE=4):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.upload(self.HEADER + rows)
+        self.assertEqual(response.data["created"], 6)
+        self.assertEqual([entry["line"] for entry in response.data["errors"]], [8, 9])
+        self.assertIn("id_employee", response.data["errors"][0]["errors"])
+        self.assertIn("document_id", response.data["errors"][1]["errors"])
+        lookups = [q for q in queries if q['sql'].startswith('SELECT') and 'employees_employee' in q['sql']]
+        self.assertEqual(len(lookups), 2)
+
+    def test_field_validators_report_per_line(self):
+        """Test model validators reject bad rows without blocking good ones"""
+        rows = (
+            "EMP-V1,Bueno,Apellido,42000001,3420000001,,\n"
+            "EMP-V2,Malo,Apellido,123,3420000002,,\n"
+            "EMP-V3,Malo,Apellido,42000003,1234,,not-a-date\n"
+        )
+        response = self.upload(self.HEADER + rows)
+        self.assertEqual(response.data["created"], 1)
+        errors = {entry["line"]: entry["errors"] for entry in response.data["errors"]}
+        self.assertEqual(set(errors[3]), {"document_id"})
+        self.assertEqual(set(errors[4]), {"phone_number", "contract_date"})
+
+    def test_import_ndjson(self):
+        """Test NDJSON uploads, including malformed lines"""
+        import json
+        lines = [
+            json.dumps({"id_employee": "EMP-J1", "name": "Ana", "lastname": "Ruiz",
+                        "document_id": 43000001, "phone_number": 3430000001}),
+            "{not json",
+            json.dumps({"id_employee": "EMP-J2", "name": "Luis", "lastname": "Ruiz",
+                        "document_id": 43000002, "phone_number": 3430000002, "salary": 1}),
+        ]
+        response = self.upload("\n".join(lines), name='employees.ndjson')
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([entry["line"] for entry in response.data["errors"]], [2, 3])
+
+    def test_import_ndjson_non_string_values(self):
+        """Test numbers and nested values in NDJSON are per-row field errors, not a 500"""
+        import json
+        base = {"name": "Eva", "lastname": "Mora"}
+        lines = [
+            json.dumps({**base, "id_employee": "EMP-T1", "document_id": 45000001,
+                        "phone_number": 3450000001, "contract_date": 20241399}),
+            json.dumps({**base, "id_employee": "EMP-T2", "document_id": 45000002,
+                        "phone_number": 3450000002, "role": ["Cajero"]}),
+            json.dumps({**base, "id_employee": "EMP-T3", "document_id": 45000003,
+                        "phone_number": 3450000003, "contract_date": "2024-01-01"}),
+        ]
+        response = self.upload("\n".join(lines), name='employees.ndjson')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1)
+        errors = {entry["line"]: entry["errors"] for entry in response.data["errors"]}
+        self.assertEqual(set(errors[1]), {"contract_date"})
+        self.assertEqual(set(errors[2]), {"role"})
+
+    def test_bad_files(self):
+        """Test file-level problems are a 400 and import nothing"""
+        self.assertEqual(self.client.post('/employees/import/', {}, format='multipart').status_code, 400)
+        response = self.upload("id_employee,name\nEMP-X,Ana\n")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.upload(self.HEADER + "EMP-X,Ana,Ruiz,44000001,3440000001,,\n", input='xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Employee.objects.filter(id_employee="EMP-X").exists())
+
+
+class EmployeeBulkUpdateTest(APITestCase):
+    """Test cases for the bulk PATCH action"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="bulk",
+            email="bulk@test.com",
+            password="testpass123",
+            id_administrator="ADM-BULK",
+            phone_number=3005550105
+        )
+        self.client.force_authenticate(user=self.user)
+        self.employees = [
+            Employee.objects.create(
+                id_employee=f"EMP-B{i}",
+                name=f"Nombre{i}",
+                lastname="Apellido",
+                document_id=50000000 + i,
+                phone_number=3500000000 + i,
+                role="Seasonal" if i < 3 else "Employee",
+            )
+            for i in range(5)
+        ]
+
+    def test_deactivate_by_filter_in_one_update(self):
+        """Test a filter-targeted delta runs as a single UPDATE"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                '/employees/bulk/?role=Seasonal', {'set': {'state': 'inactive'}}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"updated": 3})
+        updates = [q for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            sorted(Employee.objects.filter(state='inactive').values_list('id_employee', flat=True)),
+            ["EMP-B0", "EMP-B1", "EMP-B2"]
+        )
+
+    def test_update_by_ids(self):
+        """Test an id list narrows the update and bumps updated_at"""
+        first, second = self.employees[3], self.employees[4]
+        response = self.client.patch(
+            '/employees/bulk/', {'ids': [first.pk, second.pk], 'set': {'role': 'Supervisor'}}, format='json'
+        )
+        self.assertEqual(response.data, {"updated": 2})
+        first.refresh_from_db()
+        self.assertEqual(first.role, 'Supervisor')
+        self.assertGreater(first.updated_at, self.employees[0].updated_at)
+
+    def test_cached_lookups_are_invalidated(self):
+        """Test the kiosk lookup cache does not serve the old state"""
+        employee = self.employees[0]
+        self.assertEqual(employee_cache.get(employee.document_id).state, 'active')
+        self.client.patch('/employees/bulk/', {'ids': [employee.pk], 'set': {'state': 'inactive'}}, format='json')
+        self.assertEqual(employee_cache.get(employee.document_id).state, 'inactive')
+
+    def test_rejects_bad_requests(self):
+        """Test unscoped, unknown-field and invalid-value deltas are a 400"""
+        response = self.client.patch('/employees/bulk/', {'set': {'state': 'inactive'}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch('/employees/bulk/?role=Seasonal', {'set': {'name': 'X'}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch('/employees/bulk/?role=Seasonal', {'set': {'state': 'fired'}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('state', response.data)
+        response = self.client.patch('/employees/bulk/', {'ids': ['a'], 'set': {'state': 'inactive'}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Employee.objects.filter(state='inactive').exists())
+
+
+class EmployeeUniqueWriteTest(APITestCase):
+    """Test cases for uniqueness enforced by the database on serializer writes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="writer",
+            email="writer@test.com",
+            password="testpass123",
+            id_administrator="ADM-WRITE",
+            phone_number=3005550106
+        )
+        self.client.force_authenticate(user=self.user)
+        self.existing = Employee.objects.create(
+            id_employee="EMP-U0",
+            name="Ana",
+            lastname="Ruiz",
+            document_id=60000000,
+            phone_number=3600000000,
+        )
+        self.data = {
+            'id_employee': 'EMP-U1',
+            'name': 'Luis',
+            'lastname': 'Mora',
+            'document_id': 60000001,
+            'phone_number': 3600000001,
+        }
+
+    def test_create_skips_uniqueness_selects(self):
+        """Test a create runs no pre-check SELECT against the employees table"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/employees/', self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        employee_queries = [q['sql'] for q in queries if 'employees_employee' in q['sql']]
+        self.assertEqual(len(employee_queries), 1)
+        self.assertTrue(employee_queries[0].startswith('INSERT'))
+
+    def test_duplicate_create_keeps_field_errors(self):
+        """Test a clash comes back as the usual per-field 400"""
+        self.data.update(document_id=60000000, phone_number=3600000000)
+        response = self.client.post('/employees/', self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {'document_id', 'phone_number'})
+        self.assertEqual(
+            response.data['document_id'],
+            ['Empleado with this Cédula ciudadanía already exists.']
+        )
+        self.assertEqual(Employee.objects.count(), 1)
+
+    def test_duplicate_update(self):
+        """Test an update clashing with another employee is a 400, and keeping its own values is fine"""
+        other = Employee.objects.create(**self.data)
+        response = self.client.patch(f'/employees/{other.pk}/', {'id_employee': 'EMP-U0'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id_employee', response.data)
+
+        response = self.client.put(f'/employees/{other.pk}/', self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class EmployeeSoftDeleteTest(APITestCase):
+    """Test cases for soft delete and the purge command"""
+
+    def setUp(self):
+        from attendance.models import Attendance
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="deleter",
+            email="deleter@test.com",
+            password="testpass123",
+            id_administrator="ADM-DELETE",
+            phone_number=3005550107
+        )
+        self.client.force_authenticate(user=self.user)
+        self.leaver, self.stayer = [
+            Employee.objects.create(
+                id_employee=f"EMP-D{i}",
+                name="Nombre",
+                lastname="Apellido",
+                document_id=70000000 + i,
+                phone_number=3700000000 + i,
+            )
+            for i in range(2)
+        ]
+        for employee in (self.leaver, self.stayer):
+            for day in range(1, 4):
+                attendance = Attendance.objects.create(
+                    id_attendance=f"A-{employee.id_employee}-{day}",
+                    employee=employee,
+                    check_in_time="08:00",
+                )
+                attendance.date = date(2024, 2, day)
+                attendance.save()
+
+    def test_destroy_is_a_soft_delete(self):
+        """Test DELETE keeps the history, hides the employee and runs no DELETE"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(f'/employees/{self.leaver.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(any(q['sql'].startswith('DELETE') for q in queries))
+
+        self.assertEqual(Employee.all_objects.get(pk=self.leaver.pk).state, Employee.DELETED)
+        self.assertEqual(self.leaver.attendances.count(), 3)
+        self.assertEqual(
+            [row['id_employee'] for row in self.client.get('/employees/').data],
+            ["EMP-D1"]
+        )
+        self.assertEqual(self.client.get(f'/employees/{self.leaver.pk}/').status_code, 404)
+
+    def test_deleted_employee_cannot_check_in(self):
+        """Test the kiosk treats a deleted employee as unknown"""
+        employee_cache.get(self.leaver.document_id)
+        self.client.delete(f'/employees/{self.leaver.pk}/')
+        response = self.client.post('/attendance/checkin/', {'document_id': self.leaver.document_id})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deleted_employee_keeps_unique_values(self):
+        """Test a deleted employee's document_id cannot be reused by mistake"""
+        self.leaver.soft_delete()
+        response = self.client.post('/employees/', {
+            'id_employee': 'EMP-NEW',
+            'name': 'Otro',
+            'lastname': 'Apellido',
+            'document_id': self.leaver.document_id,
+            'phone_number': 3709999999,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('document_id', response.data)
+
+    def test_purge_command(self):
+        """Test the purge removes only deleted employees' rows, chunk by chunk"""
+        from django.core.management import call_command
+        from attendance.models import Attendance, DailyAttendanceSummary
+        from attendance.summary import rebuild_days
+        rebuild_days([date(2024, 2, day) for day in range(1, 4)])
+        self.leaver.soft_delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_deleted_employees', chunk_size=2, sleep=0, stdout=io.StringIO())
+
+        # Two chunks plus the empty read; the DELETEs load no rows
+        reads = [q for q in queries if q['sql'].startswith('SELECT') and 'FROM "attendance_attendance"' in q['sql']]
+        self.assertEqual(len(reads), 3)
+        self.assertFalse(Employee.all_objects.filter(pk=self.leaver.pk).exists())
+        self.assertEqual(Attendance.objects.filter(employee=self.stayer).count(), 3)
+        self.assertEqual(Attendance.objects.count(), 3)
+        self.assertEqual(
+            list(DailyAttendanceSummary.objects.order_by('date').values_list('checked_in', flat=True)),
+            [1, 1, 1]
+        )
+
+
+class EmployeeAttendanceHistoryTest(APITestCase):
+    """Test cases for the per-employee attendance history action"""
+
+    def setUp(self):
+        from datetime import time
+        from attendance.models import Attendance
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="history",
+            email="history@test.com",
+            password="testpass123",
+            id_administrator="ADM-HISTORY",
+            phone_number=3005550108
+        )
+        self.client.force_authenticate(user=self.user)
+        self.employee, other = [
+            Employee.objects.create(
+                id_employee=f"EMP-H{i}",
+                name="Nombre",
+                lastname="Apellido",
+                document_id=80000000 + i,
+                phone_number=3800000000 + i,
+            )
+            for i in range(2)
+        ]
+        self.url = f'/employees/{self.employee.pk}/attendance/'
+        days = [date(2024, 1, 30), date(2024, 1, 31), date(2024, 2, 1), date(2024, 2, 2), date(2024, 3, 4)]
+        for index, day in enumerate(days):
+            attendance = Attendance.objects.create(
+                id_attendance=f"A-H-{index}",
+                employee=self.employee,
+                check_in_time=time(9, 0) if index == 0 else time(7, 30),
+                check_out_time=None if index == 4 else time(15, 30),
+            )
+            attendance.date = day
+            attendance.save()
+        Attendance.objects.create(id_attendance="A-other", employee=other, check_in_time=time(8, 0))
+
+    def test_newest_first_with_cursor(self):
+        """Test pages walk this employee's rows by date descending, one query each"""
+        seen = []
+        params = {'page_size': 2, 'fields': 'id_attendance,date'}
+        while True:
+            with self.assertNumQueries(2):
+                response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(row['id_attendance'] for row in response.data)
+            if 'X-Next-Cursor' not in response:
+                break
+            params['cursor'] = response['X-Next-Cursor']
+        self.assertEqual(seen, ["A-H-4", "A-H-3", "A-H-2", "A-H-1", "A-H-0"])
+        self.assertEqual(set(response.data[0]), {'id_attendance', 'date'})
+
+    def test_date_filters(self):
+        """Test the listing filters apply to the history"""
+        response = self.client.get(self.url, {'date_from': '2024-02-01', 'date_to': '2024-02-29'})
+        self.assertEqual([row['id_attendance'] for row in response.data], ["A-H-3", "A-H-2"])
+
+    def test_month_totals(self):
+        """Test ?group=month aggregates per month, newest first, and paginates"""
+        response = self.client.get(self.url, {'group': 'month', 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(str(row['month']), row['days'], row['late'], row['missing_check_out'], row['minutes_worked'])
+             for row in response.data],
+            [('2024-03-01', 1, 0, 1, 0), ('2024-02-01', 2, 0, 0, 960)]
+        )
+        response = self.client.get(self.url, {'group': 'month', 'cursor': response['X-Next-Cursor']})
+        self.assertEqual(
+            [(str(row['month']), row['days'], row['late'], row['minutes_worked']) for row in response.data],
+            [('2024-01-01', 2, 1, 870)]
+        )
+
+    def test_unknown_or_deleted_employee(self):
+        """Test missing and soft-deleted employees are a 404, bad groups a 400"""
+        self.assertEqual(self.client.get('/employees/999999/attendance/').status_code, 404)
+        self.assertEqual(self.client.get(self.url, {'group': 'year'}).status_code, 400)
+        self.employee.soft_delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class EmployeeResponseCacheTest(APITestCase):
+    """Test cases for the versioned roster response cache"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="cached",
+            email="cached@test.com",
+            password="testpass123",
+            id_administrator="ADM-CACHE",
+            phone_number=3005550109
+        )
+        self.client.force_authenticate(user=self.user)
+        for i in range(3):
+            Employee.objects.create(
+                id_employee=f"EMP-R{i}",
+                name=f"Nombre{i}",
+                lastname="Apellido",
+                document_id=90000000 + i,
+                phone_number=3900000000 + i,
+            )
+
+    def test_repeat_page_skips_the_database(self):
+        """Test the same page and query string is served from cache, cursor headers included"""
+        first = self.client.get('/employees/', {'page_size': 2, 'role': 'Employee'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            again = self.client.get('/employees/', {'role': 'Employee', 'page_size': 2})
+        self.assertEqual(again['X-Cache'], 'HIT')
+        self.assertEqual(again.data, first.data)
+        self.assertEqual(again['X-Next-Cursor'], first['X-Next-Cursor'])
+
+        # A different query string is its own entry
+        self.assertEqual(self.client.get('/employees/', {'page_size': 3})['X-Cache'], 'MISS')
+
+    def test_writes_retire_cached_pages(self):
+        """Test saves and bulk updates bump the version"""
+        self.client.get('/employees/')
+        employee = Employee.objects.get(id_employee="EMP-R0")
+        employee.name = "Cambiado"
+        employee.save()
+        response = self.client.get('/employees/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['name'], "Cambiado")
+
+        self.client.patch('/employees/bulk/', {'ids': [employee.pk], 'set': {'role': 'Jefe'}}, format='json')
+        response = self.client.get('/employees/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['role'], "Jefe")
+
+    def test_history_follows_attendance_writes(self):
+        """Test the history cache is retired by a kiosk check-out (an UPDATE)"""
+        employee = Employee.objects.get(id_employee="EMP-R1")
+        self.client.post('/attendance/checkin/', {'document_id': employee.document_id})
+        url = f'/employees/{employee.pk}/attendance/'
+        self.assertIsNone(self.client.get(url).data[0]['check_out_time'])
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        self.client.post('/attendance/checkout/', {'document_id': employee.document_id})
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIsNotNone(response.data[0]['check_out_time'])
+
+    def test_hit_ratio_is_exposed(self):
+        """Test cache-stats reports the response cache counters"""
+        self.client.get('/employees/')
+        self.client.get('/employees/')
+        stats = self.client.get('/employees/cache-stats/').data['responses']['employee-list']
+        self.assertEqual(stats, {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+    def test_bulk_operations_bump_once(self):
+        """Test bumps inside bumps_deferred() collapse to one per namespace"""
+        from unittest import mock
+        from rightOnTime import response_cache
+        with mock.patch.object(response_cache, '_incr') as incr:
+            with response_cache.bumps_deferred():
+                for employee in Employee.objects.all():
+                    employee.save()
+                incr.assert_not_called()
+        incr.assert_called_once_with('employees')
+
+    def test_attendance_deletes_are_fast(self):
+        """Test deleting attendance in bulk is one DELETE, not a row-by-row collector pass"""
+        from django.db.models.deletion import Collector
+        from attendance.models import Attendance
+        self.assertTrue(Collector(using='default').can_fast_delete(Attendance.objects.all()))
+
+    def test_per_process_cache_is_bypassed(self):
+        """Test several workers on a local-memory cache always read the database"""
+        from django.test import override_settings
+        self.client.get('/employees/')
+        with override_settings(SINGLE_PROCESS=False):
+            Employee.objects.filter(id_employee="EMP-R0").update(name="Cambiado")  # no bump
+            response = self.client.get('/employees/')
+        self.assertNotIn('X-Cache', response)
+        self.assertEqual(response.data[0]['name'], "Cambiado")
+
+    def test_per_process_cache_is_reported(self):
+        """Test the system check warns when a shared cache is local to each process"""
+        from django.test import override_settings
+        from rightOnTime.shared_cache import check_shared_caches
+        self.assertEqual(check_shared_caches(None), [])
+        with override_settings(SINGLE_PROCESS=False):
+            warnings = check_shared_caches(None)
+        self.assertEqual({warning.id for warning in warnings}, {'rightOnTime.W001'})
+        self.assertEqual(len(warnings), 4)
+
+
+class EmployeeConditionalGetTest(APITestCase):
+    """Test cases for ETags on the employee endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = Administrator.objects.create_user(
+            username="etag",
+            email="etag@test.com",
+            password="testpass123",
+            id_administrator="ADM-ETAG",
+            phone_number=3005550110
+        )
+        self.client.force_authenticate(user=self.user)
+        self.employee = Employee.objects.create(
+            id_employee="EMP-E0",
+            name="Nombre",
+            lastname="Apellido",
+            document_id=91000000,
+            phone_number=3910000000,
+        )
+
+    def test_list_if_none_match(self):
+        """Test an unchanged roster is a 304, also when replayed from the response cache"""
+        response = self.client.get('/employees/')
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        self.employee.name = "Otro"
+        self.employee.save()
+        response = self.client.get('/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_uncached_304_skips_the_database(self):
+        """Test a matching ETag on an uncached endpoint is answered without any query"""
+        url = f'/employees/{self.employee.pk}/'
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Each path and query string has its own tag
+        self.assertNotEqual(self.client.get('/employees/', {'role': 'Employee'})['ETag'], etag)
+
+    def test_if_modified_since_alone_is_not_a_304(self):
+        """Test a client without the ETag is never told a changed list is unchanged"""
+        from django.utils.http import http_date
+        response = self.client.get('/employees/', HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.delete(f'/employees/{self.employee.pk}/')
+        response = self.client.get('/employees/', HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_per_process_cache_sends_no_etag(self):
+        """Test several workers on a local-memory cache never answer 304"""
+        from django.test import override_settings
+        etag = self.client.get('/employees/')['ETag']
+        with override_settings(SINGLE_PROCESS=False):
+            response = self.client.get('/employees/', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('ETag', response)
 
-# Create your tests here.
+    def test_deletes_change_the_etag(self):
+        """Test removing a row changes the validator even if max(updated_at) does not"""
+        Employee.objects.create(
+            id_employee="EMP-E1",
+            name="Nombre",
+            lastname="Apellido",
+            document_id=91000001,
+            phone_number=3910000001,
+        )
+        etag = self.client.get('/employees/')['ETag']
+        Employee.objects.filter(id_employee="EMP-E0").delete()
+        response = self.client.get('/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -1,14 +1,139 @@
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import MultiPartParser
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rightOnTime.query_params import int_param
+from rightOnTime.conditional import conditional
+from rightOnTime.response_cache import ResponseCache, response_cache_stats
+from rightOnTime.sparse_fields import SparseFieldsMixin, select_values, sparse_fields, strip_values
+from attendance.filters import ATTENDANCE_FIELDS, filter_attendance
+from attendance.history import HISTORY_GROUPS, monthly_totals, with_worked_minutes
+from attendance.pagination import EmployeeHistoryMonthPagination, EmployeeHistoryPagination
+from .bulk_import import IMPORT_FORMATS, EmployeeImport, import_format
+from .bulk_update import bulk_update_employees, clean_delta, clean_ids
+from .cache import employee_cache
+from .filters import EmployeeFilterBackend
 from .models import Employee
+from .pagination import EmployeePagination
+from .search import search_employees, search_limit
 from .serializers import EmployeeSerializer
 
-class EmployeeViewSet(ModelViewSet):
+# Roster pages/searches, retired by employee writes; history also by attendance writes
+roster_cache = ResponseCache('employee-list', ['employees'])
+history_cache = ResponseCache('employee-attendance', ['employees', 'attendance'])
+
+
+class EmployeeViewSet(SparseFieldsMixin, ModelViewSet):
     """
     ViewSet for Employee CRUD operations.
     Provides list, create, retrieve, update, and delete actions.
+    The list is keyset-paginated and filterable by state, role and contract date;
+    ?q= switches it to a ranked, capped typeahead search.
+    Reads accept ?fields= / ?exclude= to fetch and return only some columns.
+    DELETE is a soft delete (state='deleted'); see purge_deleted_employees.
+    List and history responses are cached per query string (rightOnTime.response_cache);
+    list, detail and history GETs answer If-None-Match with 304.
     Only accessible to authenticated users.
     """
     queryset = Employee.objects.all()  # All Employee records from database
     serializer_class = EmployeeSerializer  # Serializer to convert Employee <-> JSON
-    permission_classes = [IsAuthenticated]  # Requires valid JWT token to access
\ No newline at end of file
+    permission_classes = [IsAuthenticated]  # Requires valid JWT token to access
+    pagination_class = EmployeePagination  # Keyset pages on (id_employee, id), cursor in the Link header
+    filter_backends = [EmployeeFilterBackend]  # ?state=, ?role=, ?contract_date_from=/to=
+
+    @roster_cache
+    @conditional(['employees'])
+    def list(self, request, *args, **kwargs):
+        term = request.query_params.get('q', '').strip()
+        if not term:
+            return super().list(request, *args, **kwargs)
+
+        # Ranked search results are a single capped page, not a cursor walk
+        limit = search_limit(int_param(request.query_params, 'limit'))
+        queryset = search_employees(self.filter_queryset(self.get_queryset()), term, limit)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @conditional(['employees'])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        # Soft delete: a one-row UPDATE; attendance history is purged later in chunks
+        instance.soft_delete()
+
+    @action(detail=True, methods=['get'], url_path='attendance')
+    @history_cache
+    @conditional(['employees', 'attendance'])
+    def attendance(self, request, pk=None):
+        """
+        This employee's attendance, newest first, keyset-paginated on the
+        (employee, date) index. Accepts date_from/date_to/status and
+        ?fields= / ?exclude=; ?group=month returns month totals instead.
+        """
+        # Not get_object(): ?fields= here names attendance columns, not employee ones
+        employee = get_object_or_404(Employee.objects.only('pk'), pk=pk)
+        group = request.query_params.get('group', 'day')
+        if group not in HISTORY_GROUPS:
+            return Response({"error": "group debe ser 'day' o 'month'"}, status=400)
+
+        history = filter_attendance(employee.attendances.all(), request.query_params)
+
+        if group == 'month':
+            paginator = EmployeeHistoryMonthPagination()
+            months = paginator.paginate_queryset(monthly_totals(history), request)
+            return paginator.get_paginated_response(with_worked_minutes(months, history))
+
+        paginator = EmployeeHistoryPagination()
+        fields = sparse_fields(request.query_params, ATTENDANCE_FIELDS)
+        rows = paginator.paginate_queryset(select_values(history, fields, paginator.ordering), request)
+        return paginator.get_paginated_response(strip_values(rows, fields))
+
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """
+        Hit/miss counters of this worker's document_id lookup cache, plus the
+        list response caches under "responses".
+        """
+        return Response({
+            **employee_cache.stats(),
+            "responses": response_cache_stats(),
+        })
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """
+        Create many employees from an uploaded `file` (CSV with a header row,
+        or NDJSON with ?input=ndjson / a .ndjson name). Valid rows are inserted,
+        invalid ones come back in a per-line error report.
+        """
+        uploaded = request.FILES.get('file')
+        if uploaded is None:
+            return Response({"error": "file requerido"}, status=400)
+
+        input_format = import_format(uploaded, request.query_params.get('input'))
+        if input_format not in IMPORT_FORMATS:
+            return Response({"error": "input debe ser 'csv' o 'ndjson'"}, status=400)
+
+        report = EmployeeImport().run(uploaded, input_format)
+        return Response(report, status=201 if report["created"] else 200)
+
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk_update(self, request):
+        """
+        Set state/role on many employees at once with one UPDATE. Targets the
+        body's "ids" list, or every employee matching the list filters
+        (?state=, ?role=, ?contract_date_from=/to=) when no ids are given.
+        Body: {"ids": [...], "set": {"state": "inactive"}}.
+        """
+        delta = clean_delta(request.data)
+        ids = clean_ids(request.data)
+        queryset = self.filter_queryset(self.get_queryset())
+
+        filtered = any(request.query_params.get(name) for name in EmployeeFilterBackend.filter_params)
+        if ids is None and not filtered:
+            return Response({"error": "ids o un filtro requerido"}, status=400)
+
+        updated = bulk_update_employees(queryset, delta, ids)
+        return Response({"updated": updated})
@@ -0,0 +1,34 @@
+"""
+Gunicorn serving profiles.
+
+SERVER_PROFILE=wsgi (default) runs the classic sync workers on
+rightOnTime.wsgi; SERVER_PROFILE=asgi runs uvicorn workers on
+rightOnTime.asgi so the async attendance views (/attendance/async/...)
+do not hold a worker while they wait on the database.
+"""
+import os
+
+profile = os.getenv('SERVER_PROFILE', 'wsgi')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '3'))
+
+if profile == 'asgi':
+    wsgi_app = 'rightOnTime.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'rightOnTime.wsgi:application'
+
+
+def worker_exit(server, worker):
+    # Write the last_login values this worker still buffers
+    from administrator.last_login import last_login_buffer
+    last_login_buffer.flush()
+
+
+def post_worker_init(worker):
+    # System checks do not run under gunicorn; several workers need shared caches
+    if worker.cfg.workers > 1:
+        from rightOnTime.shared_cache import unshared_aliases
+        for name, alias, consequence in unshared_aliases():
+            worker.log.warning("CACHES['%s'] (%s) is local to each worker: %s. Set REDIS_URL.", alias, name, consequence)
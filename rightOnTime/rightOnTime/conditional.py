@@ -0,0 +1,91 @@
+"""
+Conditional GET (ETag) for list and detail endpoints.
+
+The ETag is derived from the response-cache versions of the namespaces a
+view reads ('employees', 'attendance') plus its path and query string. Any
+write to those tables bumps a version (rightOnTime.response_cache.bump),
+inserts, edits and deletes alike, so the tag changes whenever the data may
+have. Computing it is one cache read, whatever the table size, and a
+matching If-None-Match gets a 304 before anything is queried.
+
+That only holds while the versions live in a cache every worker shares.
+On a per-process one (rightOnTime.shared_cache) a bump on one worker is
+never seen by the others, so no ETag is sent and no 304 answered.
+
+No Last-Modified is sent: there is no cheap, exact modification time (a
+delete can leave max(updated_at) unchanged), and If-Modified-Since alone
+would then answer 304 for changed data.
+"""
+import hashlib
+from functools import wraps
+
+from django.http import HttpRequest
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.request import Request
+
+from .response_cache import aversions, request_digest, shared, versions
+
+
+def _etag(request, namespace_versions):
+    state = '.'.join(str(version) for version in namespace_versions)
+    digest = hashlib.sha1(f'{state}:{request_digest(request)}'.encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def request_etag(request, namespaces):
+    """
+    ETag of the response to `request` while `namespaces` are unchanged,
+    None when the versions are not shared between workers.
+    """
+    if not shared():
+        return None
+    return _etag(request, versions(namespaces))
+
+
+async def arequest_etag(request, namespaces):
+    """Async variant of request_etag() for the ASGI views."""
+    if not shared():
+        return None
+    return _etag(request, await aversions(namespaces))
+
+
+def not_modified(request, etag):
+    """The 304 (or 412) Django would answer for this ETag, else None."""
+    if etag is None:
+        return None
+    return get_conditional_response(request, etag=etag)
+
+
+def set_validators(response, etag):
+    if etag is None:
+        return
+    response['ETag'] = etag
+    # Let browsers keep the body but always revalidate it
+    patch_cache_control(response, private=True, no_cache=True)
+
+
+def conditional(namespaces):
+    """
+    Decorate a DRF function view or viewset method whose response depends
+    only on the rows of `namespaces` and on the request's path and query string.
+    """
+    namespaces = tuple(namespaces)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if isinstance(arg, (Request, HttpRequest)))
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            etag = request_etag(request, namespaces)
+            unchanged = not_modified(request, etag)
+            if unchanged is not None:
+                return unchanged
+
+            response = view(*args, **kwargs)
+            if response.status_code == 200:
+                set_validators(response, etag)
+            return response
+        return wrapper
+    return decorator
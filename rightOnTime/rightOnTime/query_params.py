@@ -0,0 +1,27 @@
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+
+def date_param(params, name):
+    """Optional AAAA-MM-DD query parameter; malformed values are a 400."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Fecha inválida, use AAAA-MM-DD"})
+    return parsed
+
+
+def int_param(params, name):
+    """Optional integer query parameter; malformed values are a 400."""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: "Debe ser un número entero"})
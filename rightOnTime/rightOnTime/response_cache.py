@@ -0,0 +1,216 @@
+"""
+Versioned cache for read-heavy list responses.
+
+Each cached view depends on one or more namespaces ('employees',
+'attendance'). A namespace has a version number stored in the cache itself;
+any write to its tables bumps it, which orphans every response cached under
+the old version without having to find and delete them. Keys combine the
+versions with the path and the sorted query string, so each roster page,
+filter and cursor is cached on its own.
+
+The backend is whatever CACHES[RESPONSE_CACHE_ALIAS] points to. It has to
+be shared (Redis, see REDIS_URL in settings) for a write on one worker to
+retire the responses cached by the others; a local-memory cache is only
+correct with a single process (see rightOnTime.shared_cache), so with
+several processes on one the decorated views are simply not cached.
+"""
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpRequest
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .shared_cache import is_shared
+
+# Headers worth replaying from a cached response (keyset pagination, validators)
+CACHED_HEADERS = ('Link', 'X-Next-Cursor', 'ETag', 'Cache-Control')
+
+
+def _alias():
+    return getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+
+
+def _backend():
+    return caches[_alias()]
+
+
+def shared():
+    """Whether every worker sees the same versions (rightOnTime.shared_cache)."""
+    return is_shared(_alias())
+
+
+def _ttl():
+    return getattr(settings, 'RESPONSE_CACHE_TTL', 60)
+
+
+def _version_key(namespace):
+    return f'response-cache:{namespace}:version'
+
+
+_deferred = threading.local()
+
+
+@contextmanager
+def bumps_deferred():
+    """
+    Collect the bump() calls made inside the block (per-row signals, chunked
+    deletes) and bump each namespace once when it ends.
+    """
+    if getattr(_deferred, 'namespaces', None) is not None:
+        # Nested: the outermost block bumps
+        yield
+        return
+    _deferred.namespaces = set()
+    try:
+        yield
+    finally:
+        namespaces, _deferred.namespaces = _deferred.namespaces, None
+        for namespace in sorted(namespaces):
+            bump(namespace)
+
+
+def bump(namespace):
+    """
+    Invalidate every cached response of `namespace`. Bumped again on commit:
+    a reader that caches between the write and its commit stores the old
+    rows under the first bump, which the second one retires.
+    """
+    pending = getattr(_deferred, 'namespaces', None)
+    if pending is not None:
+        pending.add(namespace)
+        return
+    _incr(namespace)
+    transaction.on_commit(lambda: _incr(namespace))
+
+
+def _incr(namespace):
+    backend = _backend()
+    key = _version_key(namespace)
+    try:
+        backend.incr(key)
+    except ValueError:
+        _versions(backend, [namespace])
+
+
+def _versions(backend, namespaces):
+    """Current versions, starting missing (first use, evicted) ones at a fresh value."""
+    keys = [_version_key(namespace) for namespace in namespaces]
+    versions = backend.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # A clock value never repeats one an older cached key could carry
+            backend.add(key, time.time_ns(), timeout=None)
+            versions[key] = backend.get(key)
+    return [versions[key] for key in keys]
+
+
+def versions(namespaces):
+    """Current version of each namespace (rightOnTime.conditional builds ETags from them)."""
+    return _versions(_backend(), namespaces)
+
+
+async def aversions(namespaces):
+    """Async variant of versions()."""
+    backend = _backend()
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = await backend.aget_many(keys)
+    for key in keys:
+        if key not in found:
+            await backend.aadd(key, time.time_ns(), timeout=None)
+            found[key] = await backend.aget(key)
+    return [found[key] for key in keys]
+
+
+def request_digest(request):
+    """Digest of the path and the sorted query string."""
+    params = getattr(request, 'query_params', request.GET)
+    query = urlencode(sorted((name, value) for name in params for value in params.getlist(name)))
+    return hashlib.sha1(f'{request.path}?{query}'.encode()).hexdigest()
+
+
+def _cached_not_modified(request, headers):
+    """The 304 for a response replayed from cache, if its stored ETag matches."""
+    if 'ETag' not in headers:
+        return None
+    return get_conditional_response(request, etag=headers['ETag'])
+
+
+class ResponseCache:
+    """Caches the data and pagination headers of 200 GET responses."""
+
+    instances = []
+
+    def __init__(self, name, namespaces):
+        self.name = name
+        self.namespaces = tuple(namespaces)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        ResponseCache.instances.append(self)
+
+    def key(self, request):
+        version = '.'.join(str(value) for value in versions(self.namespaces))
+        return f'response-cache:{self.name}:{version}:{request_digest(request)}'
+
+    def __call__(self, view):
+        """Decorate a DRF function view or viewset method; place it under the auth decorators."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            request = next(arg for arg in args if isinstance(arg, (Request, HttpRequest)))
+            if request.method != 'GET' or not shared():
+                return view(*args, **kwargs)
+
+            key = self.key(request)
+            cached = _backend().get(key)
+            if cached is not None:
+                self._count(hit=True)
+                data, headers = cached
+                # Same version, same validators: a conditional GET needs no query at all
+                unchanged = _cached_not_modified(request, headers)
+                if unchanged is not None:
+                    return unchanged
+                return Response(data, headers={**headers, 'X-Cache': 'HIT'})
+
+            self._count(hit=False)
+            response = view(*args, **kwargs)
+            if response.status_code == 200 and isinstance(response, Response):
+                headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+                _backend().set(key, (response.data, headers), _ttl())
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+def response_cache_stats():
+    """Hit/miss counters of every response cache in this worker."""
+    return {cache.name: cache.stats() for cache in ResponseCache.instances}
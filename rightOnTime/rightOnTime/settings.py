@@ -65,8 +65,13 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = { 
     'DEFAULT_AUTHENTICATION_CLASSES': [ 
-        'rest_framework_simplejwt.authentication.JWTAuthentication', 
-        ] }
+        'administrator.authentication.AdminTokenAuthentication', 
+        ],
+    # Reverse proxies in front of gunicorn that append to X-Forwarded-For.
+    # 0 (the default) ignores the header and uses REMOTE_ADDR, so clients
+    # cannot pick the IP the login lockout and throttles key on
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+    }
  
 CORS_ALLOWED_ORIGINS = [ 
     "http://localhost:8000",
@@ -121,6 +126,33 @@ DATABASES = {
     }
 }
 
+# Cache
+# Response-cache versions, login lockouts, admin revocations and kiosk nonces
+# must be seen by every worker and replica (see rightOnTime/shared_cache.py)
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Only one process serves requests (runserver), so a local-memory cache is enough
+SINGLE_PROCESS = os.getenv('SINGLE_PROCESS', 'False') == 'True'
+
+# Reject kiosk swipes not HMAC-signed by a registered KioskDevice. Off until
+# every kiosk is provisioned (attendance/authentication.py)
+KIOSK_REQUIRE_DEVICE_AUTH = os.getenv('KIOSK_REQUIRE_DEVICE_AUTH', 'False') == 'True'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -172,4 +204,7 @@ if 'test' in sys.argv or 'pytest' in sys.modules:
     DATABASES['default'] = {
         'ENGINE': 'django.db.backends.sqlite3', # Use SQLite database engine
         'NAME': ':memory:', # Store database in memory (RAM) instead of a file
-    }
\ No newline at end of file
+    }
+    # The test client is a single process sharing the local-memory cache
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    SINGLE_PROCESS = True
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Which caches have to be shared between processes.
+
+Response-cache versions, admin revocations, login lockouts and kiosk
+nonces are only correct when every gunicorn worker and replica sees the
+same cache. settings.py points CACHES at Redis when REDIS_URL is set. A
+local-memory cache is only acceptable when the deployment runs a single
+process (SINGLE_PROCESS: runserver, the test suite). Otherwise the
+`check_shared_caches` system check and the gunicorn post_worker_init hook
+warn about it.
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PER_PROCESS_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# (setting naming the alias, what goes wrong when it is per process)
+SHARED_ALIASES = (
+    ('RESPONSE_CACHE_ALIAS', 'a write on one worker does not retire the lists cached by the others'),
+    ('ADMIN_AUTH_CACHE_ALIAS', 'every admin request re-reads its administrator row'),
+    ('LOGIN_THROTTLE_CACHE_ALIAS', 'the login failure limit is multiplied by the number of workers'),
+    ('KIOSK_NONCE_CACHE_ALIAS', 'signed kiosk swipes are refused, as replays could not be caught'),
+)
+
+
+def single_process():
+    return getattr(settings, 'SINGLE_PROCESS', False)
+
+
+def is_shared(alias):
+    """Whether every process sees the same CACHES[alias] (or only one process runs)."""
+    return single_process() or settings.CACHES[alias]['BACKEND'] not in PER_PROCESS_BACKENDS
+
+
+def unshared_aliases():
+    """[(setting, alias, consequence)] of the caches that are per process."""
+    unshared = []
+    for name, consequence in SHARED_ALIASES:
+        alias = getattr(settings, name, 'default')
+        if not is_shared(alias):
+            unshared.append((name, alias, consequence))
+    return unshared
+
+
+@register('caches')
+def check_shared_caches(app_configs, **kwargs):
+    return [
+        Warning(
+            f"CACHES['{alias}'] ({name}) is local to each process: {consequence}.",
+            hint='Set REDIS_URL, or SINGLE_PROCESS=True when only one process serves requests.',
+            id='rightOnTime.W001',
+        )
+        for name, alias, consequence in unshared_aliases()
+    ]
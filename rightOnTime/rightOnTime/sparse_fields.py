@@ -0,0 +1,107 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+def _names(params, name):
+    return [part.strip() for part in params.get(name, '').split(',') if part.strip()]
+
+
+def sparse_fields(params, available):
+    """
+    Columns picked by ?fields=a,b and/or ?exclude=c, in `available` order.
+    None when neither parameter is present; unknown names are a 400.
+    """
+    fields = _names(params, FIELDS_PARAM)
+    exclude = _names(params, EXCLUDE_PARAM)
+    if not fields and not exclude:
+        return None
+
+    for param, names in ((FIELDS_PARAM, fields), (EXCLUDE_PARAM, exclude)):
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError({param: f"Campos desconocidos: {', '.join(unknown)}"})
+
+    selected = [name for name in available if (not fields or name in fields) and name not in exclude]
+    if not selected:
+        raise ValidationError({EXCLUDE_PARAM: "No queda ningún campo por devolver"})
+    return selected
+
+
+def select_values(queryset, fields, keys=()):
+    """queryset.values() restricted to `fields` plus any `keys` pagination needs."""
+    if fields is None:
+        return queryset.values()
+    names = list(fields) + [key.lstrip('-') for key in keys if key.lstrip('-') not in fields]
+    return queryset.values(*names)
+
+
+def strip_values(rows, fields):
+    """Drop the pagination keys select_values() added but the client did not ask for."""
+    if fields is None:
+        return rows
+    return [{name: row[name] for name in fields} for row in rows]
+
+
+def schema_parameters():
+    return [
+        {
+            'name': FIELDS_PARAM,
+            'required': False,
+            'in': 'query',
+            'description': 'Comma-separated columns to return (default: all).',
+            'schema': {'type': 'string'},
+        },
+        {
+            'name': EXCLUDE_PARAM,
+            'required': False,
+            'in': 'query',
+            'description': 'Comma-separated columns to leave out.',
+            'schema': {'type': 'string'},
+        },
+    ]
+
+
+class SparseFieldsSerializerMixin:
+    """ModelSerializer mixin: keep only context['fields'] when the view set it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsMixin:
+    """
+    GenericAPIView mixin for ?fields= / ?exclude= on reads. The projection is
+    pushed down to the queryset with only(), keeping the paginator's keyset
+    columns, and the serializer drops the other fields.
+    """
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = None
+            request = getattr(self, 'request', None)
+            if request is not None and request.method in SAFE_METHODS:
+                available = list(self.get_serializer_class()().fields)
+                self._sparse_fields = sparse_fields(request.query_params, available)
+        return self._sparse_fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        keys = [key.lstrip('-') for key in getattr(self.paginator, 'ordering', ())]
+        return queryset.only(*[name for name in fields + keys if name in model_fields])
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
@@ -18,7 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from employees.views import EmployeeViewSet
-from administrator.views import AdminLoginView
+from administrator.views import AdminLoginView, AdminTokenRefreshView, LoginStatsView
 
 router = DefaultRouter()
 router.register('employees', EmployeeViewSet)
@@ -27,6 +27,8 @@ router.register('employees', EmployeeViewSet)
 urlpatterns = [
     # login admin
     path('auth/login/', AdminLoginView.as_view(), name='admin-login'),
+    path('auth/refresh/', AdminTokenRefreshView.as_view(), name='admin-refresh'),
+    path('auth/login-stats/', LoginStatsView.as_view(), name='admin-login-stats'),
 
     # crud employees
     path('', include(router.urls)),
@@ -571,15 +571,14 @@ class EdgeCaseTest(TestCase):
             employee=self.employee,
             check_in_time=time(9, 0, 0)
         )
-        # Simular día diferente (manualmente)
+        # Simular día diferente (manualmente): solo se permite una asistencia por día
+        attendance1.date = date(2024, 1, 2)
+        attendance1.save()
         attendance2 = Attendance.objects.create(
             id_attendance='A-801',
             employee=self.employee,
             check_in_time=time(9, 0, 0)
         )
-        # Cambiar fecha manualmente
-        attendance2.date = date(2024, 1, 2)
-        attendance2.save()
         
         attendances = Attendance.objects.filter(employee=self.employee)
         self.assertEqual(attendances.count(), 2)
@@ -600,11 +599,14 @@ class EdgeCaseTest(TestCase):
     
     def test_attendance_related_name(self):
         """Test: Uso de related_name 'attendances' desde Employee"""
-        Attendance.objects.create(
+        attendance = Attendance.objects.create(
             id_attendance='A-802',
             employee=self.employee,
             check_in_time=time(9, 0, 0)
         )
+        # Solo se permite una asistencia por día
+        attendance.date = date(2024, 1, 2)
+        attendance.save()
         Attendance.objects.create(
             id_attendance='A-803',
             employee=self.employee,